@@ -0,0 +1,154 @@
+#batch.py
+# Generates many reports from a JSONL manifest, concurrently, in one process with shared clients and caches.
+#
+# Usage: python batch.py manifest.jsonl --output-dir reports --concurrency 4 [--resume]
+# Each manifest line is {"topic": ..., "report_structure": ... (optional), "id": ... (optional)}.
+# Reports are checkpointed under their id, which defaults to <manifest name>-<line>-<hash of topic
+# and structure>. Every run regenerates its reports unless --resume is given, in which case
+# unfinished reports are resumed and finished ones reused. Each report also gets <id>.metrics.json,
+# and metrics.prom holds the Prometheus metrics of the whole batch.
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import main
+from configs import *
+from telemetry import percentile
+
+
+def input_digest(topic: str, structure: str) -> str:
+    return hashlib.sha256(json.dumps([topic, structure]).encode("utf-8")).hexdigest()[:10]
+
+
+def read_manifest(path: str) -> list:
+    """Reads and validates the manifest; report ids default to <manifest name>-<line number>-<input digest>."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not (entry.get("topic") or "").strip():
+                raise ValueError(f"{path}:{line_number}: topic is required")
+            entry["report_structure"] = entry.get("report_structure") or report_structure
+            # Editing a line's topic or structure gives it a new id, so its old checkpoint is never reused
+            entry.setdefault("id", f"{name}-{line_number}-{input_digest(entry['topic'], entry['report_structure'])}")
+            entries.append(entry)
+    ids = [entry["id"] for entry in entries]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: report ids must be unique")
+    return entries
+
+
+def state_to_json(final_state: dict) -> dict:
+    return {
+        "report_id": final_state.get("report_id"),
+        "topic": final_state["topic"],
+        "report_structure": final_state["report_structure"],
+        "sections": [section.model_dump() for section in final_state["completed_sections"]],
+        "introduction": final_state["introduction"],
+        "conclusion": final_state["conclusion"],
+        "final_report": final_state["final_report"],
+    }
+
+
+async def run_entry(checkpointed_graph, entry: dict, output_dir: str, semaphore: asyncio.Semaphore, resume: bool) -> dict:
+    """Generates one report under the concurrency cap and writes its PDF and JSON state"""
+    result = {"id": entry["id"], "topic": entry["topic"], "status": "failed"}
+    queued_at = time.perf_counter()
+    async with semaphore:
+        started_at = time.perf_counter()
+        result["queue_seconds"] = started_at - queued_at
+        try:
+            if not resume:
+                await checkpointed_graph.checkpointer.adelete_thread(entry["id"])
+            initial_state = main.initial_report_state(entry["topic"], entry["report_structure"])
+            final_state = await main.resume_or_run(checkpointed_graph, initial_state, main.thread_config(entry["id"]))
+            result["graph_seconds"] = time.perf_counter() - started_at
+
+            pdf_start = time.perf_counter()
+            pdf_path = os.path.join(output_dir, f"{entry['id']}.pdf")
+            await asyncio.to_thread(main.render_pdf, final_state["final_report"], pdf_path)
+            with open(os.path.join(output_dir, f"{entry['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(state_to_json(final_state), f, indent=2)
+            result["pdf_seconds"] = time.perf_counter() - pdf_start
+            main.export_metrics(entry["id"], output_dir)
+
+            result["sections"] = len(final_state["completed_sections"])
+            result["status"] = "succeeded"
+        except Exception as e:
+            print(f"Report {entry['id']} failed: {e!r}")
+            main.release_research_pool(entry["id"])
+            result["error"] = str(e) or repr(e)
+        result["seconds"] = time.perf_counter() - started_at
+    return result
+
+
+def summarize(results: list, wall_seconds: float, concurrency: int) -> dict:
+    succeeded = [result for result in results if result["status"] == "succeeded"]
+    durations = [result["seconds"] for result in succeeded]
+    return {
+        "reports": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "reports_per_minute": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "mean_report_seconds": round(sum(durations) / len(durations), 3) if durations else 0.0,
+        "p50_report_seconds": round(percentile(durations, 0.5), 3),
+        "p95_report_seconds": round(percentile(durations, 0.95), 3),
+        "search_cache": main.get_search_cache().stats(),
+        "llm_usage": main.model_usage.report(),
+    }
+
+
+def print_summary(results: list, summary: dict):
+    print(f"\n{'report':<30} {'status':<10} {'queue (s)':>9} {'graph (s)':>9} {'pdf (s)':>8} {'total (s)':>9} {'sections':>8}")
+    for result in results:
+        print(f"{result['id']:<30} {result['status']:<10} {result['queue_seconds']:>9.2f} "
+              f"{result.get('graph_seconds', 0):>9.2f} {result.get('pdf_seconds', 0):>8.2f} "
+              f"{result['seconds']:>9.2f} {result.get('sections', 0):>8}")
+    print(f"\n{summary['succeeded']}/{summary['reports']} reports in {summary['wall_seconds']:.2f}s "
+          f"at concurrency {summary['concurrency']} ({summary['reports_per_minute']} reports/min; "
+          f"per report mean {summary['mean_report_seconds']}s, p50 {summary['p50_report_seconds']}s, "
+          f"p95 {summary['p95_report_seconds']}s)")
+    print(main.model_usage.format_report())
+
+
+async def run_batch(entries: list, output_dir: str, concurrency: int, resume: bool = False) -> tuple:
+    """Runs every manifest entry with at most `concurrency` reports in flight; returns (results, summary)
+
+    With resume, reports whose checkpoints are unfinished are resumed and finished ones are reused.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    # One checkpointer and one compiled graph for the whole batch
+    async with main.open_checkpointer() as checkpointer:
+        # Creates the checkpoint tables up front, since fresh runs delete their old threads first
+        await checkpointer.setup()
+        checkpointed_graph = main.main_graph_builder.compile(checkpointer=checkpointer)
+        results = await asyncio.gather(*(
+            run_entry(checkpointed_graph, entry, output_dir, semaphore, resume) for entry in entries
+        ))
+    summary = summarize(results, time.perf_counter() - start, concurrency)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "reports": results}, f, indent=2)
+    return results, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate reports for every entry of a JSONL manifest")
+    parser.add_argument("manifest", help="JSONL file with one {topic, report_structure, id} object per line")
+    parser.add_argument("--output-dir", default=REPORT_OUTPUT_DIR, help="Where PDFs, JSON states and summary.json go")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKERS, help="Reports generated at the same time")
+    parser.add_argument("--resume", action="store_true", help="Resume unfinished reports and reuse finished ones")
+    args = parser.parse_args()
+
+    entries = read_manifest(args.manifest)
+    results, summary = asyncio.run(run_batch(entries, args.output_dir, args.concurrency, args.resume))
+    print_summary(results, summary)
@@ -0,0 +1,460 @@
+#benchmark.py
+# Offline benchmark of the report graph using simulated LLM and search back ends.
+#
+# Usage: python benchmark.py --sections 1 5 10 --attempts 1 2 --latency 0.2 --jitter 0.5 --failure-rate 0.05
+# Every combination of section count (1-100) and attempt count runs end to end against fakes with
+# lognormal latencies, injected transient failures and configurable token sizes; wall time, peak
+# memory and the peak number of in-flight LLM calls and searches are reported, and --json writes
+# the results for CI. --stream runs each report the way server.py does (astream_events under a
+# checkpointer, with a thread id). --startup instead measures cold start times of fresh interpreters.
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+# The fakes replace main.py's clients, so these only name the deployments in the metrics;
+# they are set before main.py loads .env so a benchmark never picks up real credentials
+for _var, _value in {
+    "AOAI_DEPLOYMENT": "benchmark",
+    "AOAI_KEY": "benchmark",
+    "AOAI_ENDPOINT": "https://benchmark.openai.azure.com",
+    "TAVILY_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_var, _value)
+
+import main
+from rate_limiter import RateLimitScheduler
+from search_cache import SearchCache
+from progress import stream_report
+from telemetry import percentile
+
+
+# Judge/review reasoning is long relative to the answer, as with the real prompts
+SIMULATED_REASONING = "The section covers the main points but could use more detail. " * 20
+# Rough characters per token of the simulated text
+CHARS_PER_TOKEN = 4
+
+
+class LatencyModel:
+    """Lognormal call latencies with the given mean; jitter is the sigma of the underlying normal (0 = fixed)."""
+
+    def __init__(self, mean, jitter=0.0, rng=None):
+        self.mean = mean
+        self.jitter = jitter
+        self.rng = rng or random.Random(0)
+
+    def sample(self, scale=1.0):
+        if not self.jitter:
+            return self.mean * scale
+        return self.mean * scale * math.exp(self.rng.gauss(-self.jitter ** 2 / 2, self.jitter))
+
+
+class BackEndStats:
+    """Counts calls, injected failures and peak concurrency of one simulated back end."""
+
+    def __init__(self, failure_rate=0.0, rng=None):
+        self.failure_rate = failure_rate
+        self.rng = rng or random.Random(0)
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def start(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def stop(self):
+        self.in_flight -= 1
+
+    def should_fail(self):
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            self.failures += 1
+            return True
+        return False
+
+
+def transient_llm_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://benchmark.openai.azure.com"))
+
+
+class FakeStructuredLLM:
+    """Stand-in for llm.with_structured_output(schema) that returns schema-valid objects."""
+
+    def __init__(self, fake_llm, schema, include_raw=False):
+        self.fake_llm = fake_llm
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def with_config(self, *args, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        await self.fake_llm.wait(self.fake_llm.generation_time(self.schema))
+        parsed = self.fake_llm.make(self.schema, messages)
+        if self.include_raw:
+            return {"raw": self.fake_llm.message(parsed.model_dump_json(), messages), "parsed": parsed, "parsing_error": None}
+        return parsed
+
+
+class FakeToolCallingLLM:
+    """Stand-in for llm.bind_tools([schema]) that streams the schema's JSON as tool call chunks."""
+
+    def __init__(self, fake_llm, schema):
+        self.fake_llm = fake_llm
+        self.schema = schema
+
+    def with_config(self, *args, **kwargs):
+        return self
+
+    async def astream(self, messages, *args, **kwargs):
+        stats = self.fake_llm.stats
+        stats.start()
+        try:
+            if stats.should_fail():
+                await asyncio.sleep(self.fake_llm.latency.sample(0.1))
+                raise transient_llm_error()
+            data = self.fake_llm.make(self.schema, messages).model_dump()
+            # Emit fields in the (possibly reordered) schema's order, as the model would
+            text = json.dumps({name: data[name] for name in self.schema.model_fields})
+            # Spread the generation time evenly over the streamed pieces
+            pieces = max(1, self.fake_llm.section_count if self.schema.__name__ == "Sections" else 10)
+            size = -(-len(text) // pieces)
+            generation_time = self.fake_llm.generation_time(self.schema)
+            for start in range(0, len(text), size):
+                await asyncio.sleep(generation_time / pieces)
+                yield SimpleNamespace(tool_call_chunks=[{"args": text[start:start + size]}], usage_metadata=None)
+            yield SimpleNamespace(tool_call_chunks=[], usage_metadata=self.fake_llm.message(text, messages).usage_metadata)
+        finally:
+            stats.stop()
+
+
+class FakeLLM:
+    """Stand-in for the AzureChatOpenAI client with sampled latencies, transient failures and sized outputs."""
+
+    def __init__(self, latency=0.2, section_count=3, attempts=1, jitter=0.0, failure_rate=0.0,
+                 output_tokens=300, seed=0):
+        rng = random.Random(seed)
+        self.latency = LatencyModel(latency, jitter, rng)
+        self.stats = BackEndStats(failure_rate, rng)
+        self.section_count = section_count
+        self.attempts = attempts
+        self.output_tokens = output_tokens
+        self._query_ids = itertools.count()
+        self._feedback_calls = Counter()
+
+    @property
+    def calls(self):
+        return self.stats.calls
+
+    async def wait(self, seconds=None):
+        self.stats.start()
+        try:
+            if self.stats.should_fail():
+                # Connection errors surface after a fraction of a normal call
+                await asyncio.sleep(self.latency.sample(0.1))
+                raise transient_llm_error()
+            await asyncio.sleep(self.latency.sample() if seconds is None else seconds)
+        finally:
+            self.stats.stop()
+
+    def generation_time(self, schema):
+        # Outline generation time grows with the number of sections it lists
+        return self.latency.sample(self.section_count if schema.__name__ == "Sections" else 1)
+
+    def make(self, schema, messages):
+        # Compared by name since streamed calls may use a field-reordered copy of the schema
+        if schema.__name__ == "Sections":
+            return main.Sections(sections=[
+                main.Section(name=f"Section {i}", description=f"Description {i}", research=True, content="")
+                for i in range(1, self.section_count + 1)
+            ])
+        if schema.__name__ == "SearchQueries":
+            return main.SearchQueries(queries=[f"benchmark query {next(self._query_ids)}" for _ in range(3)])
+        if schema.__name__ == "FeedbackResponse":
+            # Each section asks for more research until it reaches the requested attempt count
+            match = re.search(r"Section \d+", messages[0]["content"])
+            section = match.group(0) if match else messages[0]["content"]
+            self._feedback_calls[section] += 1
+            answer = "finalize" if self._feedback_calls[section] >= self.attempts else "continue_research"
+            return main.FeedbackResponse(thought_process=SIMULATED_REASONING, answer=answer)
+        return main.ReasoningResponse(thought_process=SIMULATED_REASONING, answer="approved")
+
+    def message(self, content, messages=()):
+        input_tokens = sum(len(m["content"] if isinstance(m, dict) else m.content) for m in messages) // CHARS_PER_TOKEN
+        output_tokens = len(content) // CHARS_PER_TOKEN
+        return SimpleNamespace(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                            "total_tokens": input_tokens + output_tokens}
+        )
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        return FakeStructuredLLM(self, schema, include_raw)
+
+    def bind_tools(self, tools, **kwargs):
+        return FakeToolCallingLLM(self, tools[0])
+
+    def with_config(self, *args, **kwargs):
+        return self
+
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        await self.wait()
+        sentence = "Simulated content about the benchmark topic. "
+        body = sentence * max(1, self.output_tokens * CHARS_PER_TOKEN // len(sentence))
+        return self.message(f"## Benchmark section\n\n{body}\n\n", messages)
+
+
+class FakeTavilyClient:
+    """Stand-in for AsyncTavilyClient with sampled latencies, failures and page sizes."""
+
+    def __init__(self, latency=0.2, jitter=0.0, failure_rate=0.0, page_tokens=600, seed=0):
+        rng = random.Random(seed + 1)
+        self.latency = LatencyModel(latency, jitter, rng)
+        self.stats = BackEndStats(failure_rate, rng)
+        self.page_tokens = page_tokens
+
+    @property
+    def calls(self):
+        return self.stats.calls
+
+    async def wait(self):
+        self.stats.start()
+        try:
+            await asyncio.sleep(self.latency.sample())
+            if self.stats.should_fail():
+                raise ConnectionError("simulated search failure")
+        finally:
+            self.stats.stop()
+
+    async def search(self, query, include_raw_content=False, **kwargs):
+        await self.wait()
+        return {
+            "query": query,
+            "results": [
+                {
+                    "url": f"https://example.com/{abs(hash(query))}/{i}",
+                    "title": f"Result {i} for {query}",
+                    "content": f"Snippet {i} for {query}.",
+                    "raw_content": self.page(query, i) if include_raw_content else None,
+                    "score": 1.0 - i / 10,
+                }
+                for i in range(5)
+            ],
+        }
+
+    async def extract(self, urls, **kwargs):
+        await self.wait()
+        return {"results": [{"url": url, "raw_content": self.page(url, 0)} for url in urls], "failed_results": []}
+
+    def page(self, key, index):
+        sentence = f"Full content {index} for {key}. "
+        return sentence * max(1, self.page_tokens * CHARS_PER_TOKEN // len(sentence))
+
+
+def install_fakes(fake_llm, fake_search, backoff_seconds):
+    main.create_llm = lambda deployment, max_tokens, timeout: fake_llm
+    main.llm_clients.clear()
+    main.model_usage.reset()
+    main.node_paths.reset()
+    main.metrics.reset()
+    main.tavily_async_client = fake_search
+    main.search_cache = SearchCache(path=None)
+    # Budgets high enough that the scheduler never throttles the simulated back ends
+    main.rate_limiter = RateLimitScheduler(default_rpm=1e6, default_tpm=1e9, search_qps=1e4)
+    # Retry backoff on the scale of the simulated latencies instead of real seconds
+    main.LLM_RETRY_BACKOFF_SECONDS = backoff_seconds
+
+
+async def stream_once(initial_state, configurable):
+    """Runs one report through progress.stream_report under a throwaway checkpointer, like a server job"""
+    messages = []
+    with tempfile.TemporaryDirectory() as directory:
+        async with main.open_checkpointer(os.path.join(directory, "checkpoints.sqlite")) as checkpointer:
+            checkpointed_graph = main.main_graph_builder.compile(checkpointer=checkpointer)
+            config = main.thread_config("benchmark", {"recursion_limit": 100, "configurable": configurable})
+            final_state = await stream_report(checkpointed_graph, initial_state, config, messages.append)
+    if not final_state.get("final_report") or messages[-1]["type"] != "report_complete":
+        raise RuntimeError("Streamed run ended without a final report")
+    return messages
+
+
+async def run_once(section_count, latency, attempts, configurable=None, jitter=0.0, failure_rate=0.0,
+                   output_tokens=300, page_tokens=600, seed=0, stream=False):
+    """Runs the full report graph once against fresh fakes and returns timing, memory and concurrency stats."""
+    fake_llm = FakeLLM(latency=latency, section_count=section_count, attempts=attempts, jitter=jitter,
+                       failure_rate=failure_rate, output_tokens=output_tokens, seed=seed)
+    fake_search = FakeTavilyClient(latency=latency, jitter=jitter, failure_rate=failure_rate,
+                                   page_tokens=page_tokens, seed=seed)
+    install_fakes(fake_llm, fake_search, latency)
+
+    initial_state = main.initial_report_state("benchmark topic", "benchmark structure")
+    error = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if stream:
+            await stream_once(initial_state, configurable or {})
+        else:
+            await main.graph.ainvoke(initial_state, {"recursion_limit": 100, "configurable": configurable or {}})
+    except Exception as e:
+        # Injected failures can exhaust the retries; the run still counts towards the failure rate
+        error = repr(e)
+    wall_time = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    usage = main.model_usage.report()
+    return {
+        "sections": section_count,
+        "attempts": attempts,
+        "status": "failed" if error else "succeeded",
+        "error": error,
+        "wall_time": wall_time,
+        "peak_memory_mb": peak_memory / 2 ** 20,
+        "llm_calls": fake_llm.calls,
+        "llm_failures": fake_llm.stats.failures,
+        "llm_retries": sum(value for _, value in main.metrics.samples("report_llm_retries_total")),
+        "peak_llm_concurrency": fake_llm.stats.peak_in_flight,
+        "search_calls": fake_search.calls,
+        "search_failures": fake_search.stats.failures,
+        "peak_search_concurrency": fake_search.stats.peak_in_flight,
+        "input_tokens": sum(row["input_tokens"] for row in usage),
+        "output_tokens": sum(row["output_tokens"] for row in usage),
+    }
+
+
+async def run_benchmark(section_counts, latency, attempts=(1,), configurable=None, repeats=1, stream=False, **fake_options):
+    """Runs every (section count, attempt count) combination `repeats` times and prints a summary table."""
+    results = []
+    for attempt_count, section_count in itertools.product(attempts, section_counts):
+        for repeat in range(repeats):
+            options = {**fake_options, "seed": fake_options.get("seed", 0) + repeat}
+            results.append(await run_once(section_count, latency, attempt_count, configurable, stream=stream, **options))
+    print_results(results)
+    print(f"\nLLM usage by node and model (last run):\n{main.model_usage.format_report()}")
+    print("Node paths (last run): ", main.node_paths.report())
+    return results
+
+
+def print_results(results):
+    # Per-section wall time of the smallest run of each attempt count estimates a serial pipeline
+    baselines = {}
+    for result in sorted(results, key=lambda result: result["sections"]):
+        if result["status"] == "succeeded":
+            baselines.setdefault(result["attempts"], result["wall_time"] / result["sections"])
+
+    print(f"\n{'sections':>8} {'attempts':>8} {'status':>9} {'wall (s)':>9} {'speedup':>8} {'peak MB':>8} "
+          f"{'llm':>6} {'fail':>5} {'retry':>5} {'llm peak':>8} {'search':>7} {'fail':>5} {'search peak':>11}")
+    for result in results:
+        serial_estimate = baselines.get(result["attempts"], 0) * result["sections"]
+        speedup = serial_estimate / result["wall_time"] if result["wall_time"] else 0
+        print(f"{result['sections']:>8} {result['attempts']:>8} {result['status']:>9} {result['wall_time']:>9.2f} "
+              f"{speedup:>8.1f} {result['peak_memory_mb']:>8.1f} {result['llm_calls']:>6} {result['llm_failures']:>5} "
+              f"{result['llm_retries']:>5} {result['peak_llm_concurrency']:>8} {result['search_calls']:>7} "
+              f"{result['search_failures']:>5} {result['peak_search_concurrency']:>11}")
+
+    failed = sum(result["status"] == "failed" for result in results)
+    llm_calls = sum(result["llm_calls"] for result in results)
+    llm_failures = sum(result["llm_failures"] for result in results)
+    print(f"\n{len(results) - failed}/{len(results)} runs succeeded; "
+          f"{llm_failures}/{llm_calls} LLM calls failed and were retried or surfaced")
+    wall_times = [result["wall_time"] for result in results if result["status"] == "succeeded"]
+    if len(wall_times) > 1:
+        print(f"wall time p50 {percentile(wall_times, 0.5):.2f}s, p95 {percentile(wall_times, 0.95):.2f}s")
+
+
+# Startup stages timed in fresh interpreters (the timer covers the code, not interpreter boot)
+STARTUP_STAGES = {
+    "import main": "import main",
+    "first LLM client": "import main; main.get_llm(next(iter(main.MODEL_ROUTING)))",
+    "first search client": "import main; main.get_tavily_client()",
+    "PDF renderer": "import main, create_pdf",
+    "warm_up()": "import main; main.warm_up()",
+    "import server": "import server",
+}
+
+
+def measure_startup(repeats=5):
+    """Times each startup stage in `repeats` fresh interpreters; returns {stage: {median, min, process}}."""
+    results = {}
+    for stage, code in STARTUP_STAGES.items():
+        timings, process_timings = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-c", f"import time; start = time.perf_counter(); {code}; print(time.perf_counter() - start)"],
+                cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+            ).stdout
+            process_timings.append(time.perf_counter() - start)
+            timings.append(float(output.strip().splitlines()[-1]))
+        results[stage] = {"median": statistics.median(timings), "min": min(timings),
+                          "process": statistics.median(process_timings)}
+
+    print(f"\n{'stage':<22} {'median (s)':>10} {'min (s)':>8} {'process (s)':>12}")
+    for stage, result in results.items():
+        print(f"{stage:<22} {result['median']:>10.3f} {result['min']:>8.3f} {result['process']:>12.3f}")
+    return results
+
+
+def section_count(value):
+    count = int(value)
+    if not 1 <= count <= 100:
+        raise argparse.ArgumentTypeError("section counts must be between 1 and 100")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the report graph with simulated back ends")
+    parser.add_argument("--sections", type=section_count, nargs="+", default=[1, 5, 10], help="Section counts (1-100)")
+    parser.add_argument("--attempts", type=int, nargs="+", default=[1], help="Research attempts per section")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean seconds per simulated LLM or search call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Lognormal sigma of call latencies (0 = fixed)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of simulated calls that fail transiently")
+    parser.add_argument("--output-tokens", type=int, default=300, help="Tokens per simulated section draft")
+    parser.add_argument("--page-tokens", type=int, default=600, help="Tokens per simulated search page")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per combination, with different seeds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the per-run results to this file")
+    parser.add_argument("--no-pipelining", action="store_true", help="Wait for the full section list before fanning out")
+    parser.add_argument("--no-early-exit", action="store_true", help="Wait for complete judge/review outputs")
+    parser.add_argument("--stream", action="store_true", help="Run reports through stream_report with a checkpointer, like server.py")
+    parser.add_argument("--startup", action="store_true", help="Measure cold start times instead of report runs")
+    args = parser.parse_args()
+    if args.startup:
+        results = measure_startup(args.repeats if args.repeats > 1 else 5)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        sys.exit()
+    configurable = {}
+    if args.no_pipelining:
+        configurable["pipelined_fanout"] = False
+    if args.no_early_exit:
+        configurable["early_exit"] = False
+    results = asyncio.run(run_benchmark(
+        args.sections, args.latency, args.attempts, configurable, repeats=args.repeats, stream=args.stream, jitter=args.jitter,
+        failure_rate=args.failure_rate, output_tokens=args.output_tokens, page_tokens=args.page_tokens, seed=args.seed,
+    ))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,315 @@
+#cassette.py
+# Records every LLM and Tavily call of a real report run into a gzipped cassette and replays it offline.
+#
+# Usage: python cassette.py record reports/langgraph.cassette.gz --topic "..." [--structure "..."]
+#        python cassette.py replay reports/langgraph.cassette.gz [--latency] [--profile] [--output report.pdf]
+# Replays need no network or credentials: responses are matched to requests by a hash of the
+# deployment, call shape and prompt, so the same report is rebuilt exactly; with --latency each
+# response is delayed by the time the real call took. --profile prints the hottest functions.
+import argparse
+import asyncio
+import cProfile
+import gzip
+import hashlib
+import json
+import os
+import pstats
+import time
+from collections import Counter, defaultdict, deque
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import main
+from configs import *
+from search_cache import SearchCache
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(Exception):
+    """Raised when a replayed run makes a request the cassette has no recording for."""
+
+
+def message_payload(messages) -> list:
+    """Chat messages (dicts or LangChain messages) as [role, content] pairs"""
+    return [[m["role"], m["content"]] if isinstance(m, dict) else [m.type, m.content] for m in messages]
+
+
+def request_key(request: dict) -> str:
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded calls of one report run, keyed by a hash of each request.
+
+    Requests are matched exactly first; a replay whose prompts drift (e.g. because
+    concurrent searches finished in a different order) falls back to the next unused
+    recording of the same call shape, and take() raises CassetteMiss when none is left.
+    """
+
+    def __init__(self, path: str, meta: dict = None, entries: list = None):
+        self.path = path
+        # Whether replayed responses take as long as the recorded calls did
+        self.replay_latency = False
+        self.meta = meta or {}
+        self.entries = entries or []
+        self.matches = Counter()
+        self._by_key = defaultdict(deque)
+        self._by_signature = defaultdict(deque)
+        for entry in self.entries:
+            self._by_key[entry["key"]].append(entry)
+            self._by_signature[entry["signature"]].append(entry)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"{path}: unsupported cassette version {data.get('version')}")
+        return cls(path, data["meta"], data["entries"])
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump({"version": CASSETTE_VERSION, "meta": self.meta, "entries": self.entries}, f, separators=(",", ":"))
+
+    def record(self, signature: str, request: dict, response, seconds: float):
+        self.entries.append({"signature": signature, "key": request_key(request), "seconds": round(seconds, 4),
+                             "response": response})
+
+    def take(self, signature: str, request: dict):
+        """Returns the recorded entry for a request, consuming it."""
+        for match, candidates in (("exact", self._by_key.get(request_key(request), ())),
+                                  ("fallback", self._by_signature.get(signature, ()))):
+            entry = next((entry for entry in candidates if not entry.get("used")), None)
+            if entry is not None:
+                self.matches[match] += 1
+                entry["used"] = True
+                return entry
+        self.matches["miss"] += 1
+        raise CassetteMiss(f"No recorded response left for {signature}")
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "unused": sum(not entry.get("used") for entry in self.entries),
+                **self.matches}
+
+
+class _ChatModelProxy:
+    """Mirrors the parts of the chat model interface main.py uses, describing each request as it is built."""
+
+    def __init__(self, cassette: Cassette, deployment: str, runnable=None, request: dict = None, schema=None):
+        self.cassette = cassette
+        self.deployment = deployment
+        self.runnable = runnable
+        self.request = request or {"deployment": deployment, "kind": "invoke"}
+        self.schema = schema
+
+    def _derive(self, runnable, schema=None, **request):
+        return type(self)(self.cassette, self.deployment, runnable, {**self.request, **request}, schema or self.schema)
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        runnable = self.runnable and self.runnable.with_structured_output(schema, include_raw=include_raw, **kwargs)
+        return self._derive(runnable, schema, kind="structured", fields=list(schema.model_fields), include_raw=include_raw)
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        runnable = self.runnable and self.runnable.bind_tools(tools, tool_choice=tool_choice, **kwargs)
+        return self._derive(runnable, tools[0], kind="tool_stream", fields=list(tools[0].model_fields), tool_choice=tool_choice)
+
+    def bind(self, **kwargs):
+        runnable = self.runnable and self.runnable.bind(**kwargs)
+        return self._derive(runnable, bind=kwargs)
+
+    def with_config(self, config=None, **kwargs):
+        runnable = self.runnable and self.runnable.with_config(config, **kwargs)
+        return self._derive(runnable, run_name=(config or {}).get("run_name", kwargs.get("run_name")))
+
+    def _signature(self) -> str:
+        return f"llm:{self.deployment}:{self.request['kind']}:{self.request.get('run_name') or ''}"
+
+    def _full_request(self, messages) -> dict:
+        return {**self.request, "messages": message_payload(messages)}
+
+
+class RecordingChatModel(_ChatModelProxy):
+    """Wraps a real chat client and records every response into the cassette."""
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        start = time.perf_counter()
+        response = await self.runnable.ainvoke(messages, *args, **kwargs)
+        if self.request["kind"] == "structured":
+            raw, parsed, error = response["raw"], response["parsed"], response["parsing_error"]
+            recorded = {"content": raw.content, "usage": raw.usage_metadata,
+                        "parsed": parsed.model_dump() if parsed is not None else None,
+                        "parsing_error": str(error) if error is not None else None}
+        else:
+            recorded = {"content": response.content, "usage": response.usage_metadata}
+        self.cassette.record(self._signature(), self._full_request(messages), recorded, time.perf_counter() - start)
+        return response
+
+    async def astream(self, messages, *args, **kwargs):
+        start = time.perf_counter()
+        chunks, usage = [], None
+        try:
+            async for chunk in self.runnable.astream(messages, *args, **kwargs):
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                args_text = "".join(tool_call_chunk.get("args") or "" for tool_call_chunk in chunk.tool_call_chunks)
+                if args_text:
+                    chunks.append([round(time.perf_counter() - start, 4), args_text])
+                yield chunk
+        finally:
+            # Also runs when the caller stops early, so early-exit generations are recorded as far as they got
+            recorded = {"chunks": chunks, "usage": usage}
+            self.cassette.record(self._signature(), self._full_request(messages), recorded, time.perf_counter() - start)
+
+
+class ReplayChatModel(_ChatModelProxy):
+    """Answers chat requests from the cassette, optionally taking as long as the recorded calls."""
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        entry = self.cassette.take(self._signature(), self._full_request(messages))
+        recorded = entry["response"]
+        await asyncio.sleep(entry["seconds"] if self.cassette.replay_latency else 0)
+        raw = AIMessage(content=recorded["content"], usage_metadata=recorded["usage"])
+        if self.request["kind"] != "structured":
+            return raw
+        parsed = self.schema.model_validate(recorded["parsed"]) if recorded["parsed"] is not None else None
+        error = ValueError(recorded["parsing_error"]) if recorded["parsing_error"] else None
+        return {"raw": raw, "parsed": parsed, "parsing_error": error}
+
+    async def astream(self, messages, *args, **kwargs):
+        entry = self.cassette.take(self._signature(), self._full_request(messages))
+        recorded = entry["response"]
+        elapsed = 0.0
+        for offset, args_text in recorded["chunks"]:
+            await asyncio.sleep(offset - elapsed if self.cassette.replay_latency else 0)
+            elapsed = offset
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": None, "args": args_text, "id": None, "index": 0}
+            ])
+        if recorded["usage"]:
+            yield AIMessageChunk(content="", usage_metadata=recorded["usage"])
+
+
+class RecordingSearchClient:
+    """Wraps AsyncTavilyClient and records every search and extract response."""
+
+    def __init__(self, client, cassette: Cassette):
+        self.client = client
+        self.cassette = cassette
+
+    async def search(self, query, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.search(query, **kwargs)
+        self.cassette.record("search", {"query": query, **kwargs}, response, time.perf_counter() - start)
+        return response
+
+    async def extract(self, urls, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.extract(urls=urls, **kwargs)
+        self.cassette.record("extract", {"urls": urls, **kwargs}, response, time.perf_counter() - start)
+        return response
+
+
+class ReplaySearchClient:
+    """Answers Tavily searches and extracts from the cassette."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def _replay(self, kind: str, request: dict):
+        entry = self.cassette.take(kind, request)
+        await asyncio.sleep(entry["seconds"] if self.cassette.replay_latency else 0)
+        return entry["response"]
+
+    async def search(self, query, **kwargs):
+        return await self._replay("search", {"query": query, **kwargs})
+
+    async def extract(self, urls, **kwargs):
+        return await self._replay("extract", {"urls": urls, **kwargs})
+
+
+def install(cassette: Cassette, record: bool, replay_latency: bool = False):
+    """Routes main.py's LLM and Tavily calls through the cassette
+
+    The search cache is replaced by an empty in-memory one so that every search of the
+    run is recorded (or replayed) rather than answered from an earlier run's cache.
+    """
+    create_llm = main.create_llm
+    if record:
+        main.create_llm = lambda deployment, max_tokens, timeout: RecordingChatModel(
+            cassette, deployment, create_llm(deployment, max_tokens, timeout)
+        )
+        main.tavily_async_client = RecordingSearchClient(main.get_tavily_client(), cassette)
+    else:
+        # Requests are keyed by deployment, so route to the deployments that were recorded
+        main.tier_deployments.update(cassette.meta["deployments"])
+        main.configure_tier_limits()
+        cassette.replay_latency = replay_latency
+        main.create_llm = lambda deployment, max_tokens, timeout: ReplayChatModel(cassette, deployment)
+        main.tavily_async_client = ReplaySearchClient(cassette)
+    main.llm_clients.clear()
+    main.search_cache = SearchCache(path=None)
+
+
+async def run_cassette(cassette: Cassette, configurable: dict) -> dict:
+    """Runs the report graph (without a checkpointer) for the topic stored in the cassette"""
+    initial_state = main.initial_report_state(cassette.meta["topic"], cassette.meta["report_structure"])
+    return await main.graph.ainvoke(initial_state, {"recursion_limit": 100, "configurable": configurable})
+
+
+def replay(cassette: Cassette, output: str, replay_latency: bool):
+    install(cassette, record=False, replay_latency=replay_latency)
+    start = time.perf_counter()
+    final_state = asyncio.run(run_cassette(cassette, cassette.meta["configurable"]))
+    graph_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    main.render_pdf(final_state["final_report"], output)
+    pdf_seconds = time.perf_counter() - start
+
+    print(f"Replayed {cassette.path}: graph {graph_seconds:.2f}s, pdf {pdf_seconds:.2f}s -> {output}")
+    if final_state["final_report"] == cassette.meta.get("final_report"):
+        print("Final report matches the recording")
+    else:
+        print("Final report differs from the recording")
+    print("Cassette matches: ", cassette.stats())
+    print("Node seconds: ", main.metrics.run_summary()["report_node_seconds"]["by_node"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a real report run to a cassette, or replay one offline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Generate a report against the real services and record it")
+    record_parser.add_argument("cassette")
+    record_parser.add_argument("--topic", required=True)
+    record_parser.add_argument("--structure", default=report_structure, help="Report outline (defaults to configs.py)")
+    replay_parser = subparsers.add_parser("replay", help="Rebuild a recorded report without network access")
+    replay_parser.add_argument("cassette")
+    replay_parser.add_argument("--latency", action="store_true", help="Delay responses by the recorded call times")
+    replay_parser.add_argument("--profile", action="store_true", help="Print the hottest functions of the replay")
+    replay_parser.add_argument("--output", default=os.path.join(REPORT_OUTPUT_DIR, "replay.pdf"))
+    args = parser.parse_args()
+
+    if args.command == "record":
+        cassette = Cassette(args.cassette, {"topic": args.topic, "report_structure": args.structure,
+                                            # Reusing stored sections would skip the calls worth recording
+                                            "configurable": {"incremental": False},
+                                            "deployments": dict(main.tier_deployments)})
+        install(cassette, record=True)
+        final_state = asyncio.run(run_cassette(cassette, cassette.meta["configurable"]))
+        cassette.meta["final_report"] = final_state["final_report"]
+        cassette.save()
+        print(f"Recorded {len(cassette.entries)} calls to {args.cassette}")
+    else:
+        cassette = Cassette.load(args.cassette)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.runcall(replay, cassette, args.output, args.latency)
+            pstats.Stats(profiler).sort_stats("tottime").print_stats(25)
+        else:
+            replay(cassette, args.output, args.latency)
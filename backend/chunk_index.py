@@ -0,0 +1,134 @@
+#chunk_index.py
+# In-process BM25 index over chunks of fetched raw_content
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP_WORDS = 30
+
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this to was were what "
+    "when which with will".split()
+)
+
+
+def tokenize(text: str) -> list:
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def chunk_text(text: str, chunk_words: int = CHUNK_WORDS, overlap_words: int = CHUNK_OVERLAP_WORDS) -> list:
+    """Splits text into overlapping windows of whitespace-delimited words."""
+    words = text.split()
+    if not words:
+        return []
+    step = max(chunk_words - overlap_words, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+class ChunkIndex:
+    """BM25 (Okapi) index over source chunks; sources are indexed once per URL (see replace_source)."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks = []
+        self._lengths = []
+        self._postings = defaultdict(dict)
+        self._total_length = 0
+        self._urls = set()
+        self._source_chunks = defaultdict(list)
+        self._removed = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.chunks) - self._removed
+
+    def has_source(self, url: str) -> bool:
+        return url in self._urls
+
+    def add_source(self, source: dict) -> int:
+        """Chunks and indexes a source's raw_content (or snippet); returns the number of chunks added."""
+        with self._lock:
+            if source['url'] in self._urls:
+                return 0
+            return self._index(source)
+
+    def replace_source(self, source: dict) -> int:
+        """Re-indexes a source whose text changed (e.g. a snippet that now has its full page)."""
+        with self._lock:
+            # Removed chunks stay in self.chunks as None so later chunk ids remain valid
+            for chunk_id in self._source_chunks.pop(source['url'], []):
+                for term in set(tokenize(self.chunks[chunk_id]['text'])):
+                    self._postings[term].pop(chunk_id, None)
+                self._total_length -= self._lengths[chunk_id]
+                self.chunks[chunk_id] = None
+                self._removed += 1
+            return self._index(source)
+
+    def _index(self, source: dict) -> int:
+        self._urls.add(source['url'])
+        text = source.get('raw_content') or source.get('content') or ''
+        added = 0
+        for chunk in chunk_text(text):
+            terms = tokenize(chunk)
+            if not terms:
+                continue
+            chunk_id = len(self.chunks)
+            self.chunks.append({"url": source['url'], "title": source.get('title', ''), "text": chunk})
+            self._lengths.append(len(terms))
+            self._total_length += len(terms)
+            for term, frequency in Counter(terms).items():
+                self._postings[term][chunk_id] = frequency
+            self._source_chunks[source['url']].append(chunk_id)
+            added += 1
+        return added
+
+    def search(self, query: str, k: int = 8, exclude_urls: Optional[set] = None) -> list:
+        """Returns the top-k chunks for the query as dicts with url, title, text, score and term coverage."""
+        chunk_count = len(self)
+        if not chunk_count:
+            return []
+        average_length = self._total_length / chunk_count
+        scores = defaultdict(float)
+        matched_terms = Counter()
+        query_terms = set(tokenize(query))
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, frequency in postings.items():
+                length_norm = 1 - self.b + self.b * self._lengths[chunk_id] / average_length
+                scores[chunk_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                matched_terms[chunk_id] += 1
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for chunk_id, score in ranked:
+            chunk = self.chunks[chunk_id]
+            if exclude_urls and chunk['url'] in exclude_urls:
+                continue
+            results.append({**chunk, "score": score, "term_coverage": matched_terms[chunk_id] / len(query_terms)})
+            if len(results) >= k:
+                break
+        return results
+
+
+def format_chunks(chunks: list) -> str:
+    """Formats retrieved chunks for the research prompt."""
+    if not chunks:
+        return ""
+    parts = ["Most relevant passages from full source content:\n\n"]
+    for chunk in chunks:
+        parts.append(f"Passage from {chunk['title']} ({chunk['url']}):\n===\n{chunk['text']}\n===\n\n")
+    return "".join(parts).strip()
+
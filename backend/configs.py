@@ -1,4 +1,133 @@
-
+import os
+
+# Search cache settings
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite")
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", 24 * 60 * 60))
+SEARCH_CACHE_MAX_MEMORY_ENTRIES = 512
+SEARCH_CACHE_MAX_DISK_ENTRIES = 10000
+
+# Checkpoint database used to resume interrupted report runs
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+
+# Parse well-formed report structures (headings, "Name - description" items) without the LLM,
+# which is then only used for free-form structures
+# (can also be toggled per run with config={"configurable": {"outline_fast_path": False}})
+OUTLINE_FAST_PATH = os.getenv("OUTLINE_FAST_PATH", "true").lower() == "true"
+
+# Pipelined fan-out: when the section list comes from the LLM, stream it and start researching
+# each section as soon as its JSON object is complete, overlapping research with outline generation
+# (can also be toggled per run with config={"configurable": {"pipelined_fanout": False}}).
+# Pipelined sections all run inside one node and are not checkpointed one by one, so unless a run
+# sets pipelined_fanout explicitly, checkpointed runs (those with a thread_id) fan out after the list
+PIPELINED_FANOUT = os.getenv("PIPELINED_FANOUT", "true").lower() == "true"
+
+# Incremental mode reuses unchanged sections and intro/conclusion from previous runs
+# (can also be enabled per run with config={"configurable": {"incremental": True}})
+INCREMENTAL_MODE = os.getenv("INCREMENTAL_MODE", "false").lower() == "true"
+INCREMENTAL_STORE_PATH = os.getenv("INCREMENTAL_STORE_PATH", ".cache/incremental.sqlite")
+
+# Research prompt packing: total token budget for sources, and cap per source
+RESEARCH_TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", 6000))
+MAX_TOKENS_PER_SOURCE = 1000
+# Estimated Jaccard similarity above which two sources count as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# Number of BM25-ranked raw_content passages added to each research prompt
+RESEARCH_TOP_K_CHUNKS = 8
+# When the report's shared research pool already holds this many relevant sources for a
+# section (passages covering enough of its name/description terms), fewer new searches are issued
+RESEARCH_POOL_MIN_SOURCES = 3
+RESEARCH_POOL_MIN_TERM_COVERAGE = 0.3
+RESEARCH_POOL_REDUCED_QUERIES = 2
+
+# Generated search queries this similar to an earlier one are skipped; with report scope,
+# queries run by other sections count too and their results are reused
+QUERY_DEDUPE_THRESHOLD = 0.75
+QUERY_DEDUPE_REPORT_SCOPE = True
+
+# Two-phase retrieval: search returns snippets only, and full page content is fetched
+# afterwards for the top ranked sources (capped at MAX_RAW_CONTENT_CHARS on ingestion)
+TWO_PHASE_RETRIEVAL = os.getenv("TWO_PHASE_RETRIEVAL", "true").lower() == "true"
+RAW_CONTENT_FETCH_TOP_N = 5
+MAX_RAW_CONTENT_CHARS = 20000
+
+# Research loop: maximum attempts per section, and speculative mode, which starts the next
+# round's searches and a finalize draft while evaluate_research runs
+# (can also be enabled per run with config={"configurable": {"speculative": True}})
+MAX_RESEARCH_ATTEMPTS = 3
+SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "false").lower() == "true"
+# Novelty-driven convergence: after the first attempt, finalize without the LLM judge when an
+# attempt's marginal novelty score (0-1) is below the low threshold, keep researching without it
+# above the high threshold, and only ask the judge in between
+NOVELTY_CONVERGENCE = os.getenv("NOVELTY_CONVERGENCE", "true").lower() == "true"
+NOVELTY_LOW_THRESHOLD = 0.2
+NOVELTY_HIGH_THRESHOLD = 0.75
+
+# Early exit for structured judge/review calls: stream the output and stop generating once the
+# "answer" field settles the outcome (can also be toggled per run with configurable "early_exit").
+# STRUCTURED_FIELD_ORDER sets the order the model emits each schema's fields in; answer-first
+# makes the decision available after a few tokens, reasoning-first keeps chain-of-thought quality
+EARLY_EXIT_STRUCTURED = os.getenv("EARLY_EXIT_STRUCTURED", "true").lower() == "true"
+STRUCTURED_FIELD_ORDER = {
+    "FeedbackResponse": ["answer", "thought_process"],
+    "ReasoningResponse": ["answer", "thought_process"],
+}
+
+# Revision mode: each research attempt rewrites the section into one merged draft capped at
+# SECTION_MAX_TOKENS, instead of appending a new draft, so per-attempt prompt size stays flat
+SECTION_REVISION_MODE = os.getenv("SECTION_REVISION_MODE", "true").lower() == "true"
+SECTION_MAX_TOKENS = int(os.getenv("SECTION_MAX_TOKENS", 1500))
+
+# Model tiers: the Azure OpenAI deployment behind each tier (resolved in main.py after .env is
+# loaded), its price per 1K input/output tokens, used for the per-node cost report, and the
+# requests/tokens per minute quota of its deployment (defaults: AOAI_REQUESTS/TOKENS_PER_MINUTE).
+# The small tier falls back to the large deployment when AOAI_SMALL_DEPLOYMENT is not set;
+# the two tiers then share the large tier's quota.
+MODEL_TIERS = {
+    "large": {
+        "deployment_env": "AOAI_DEPLOYMENT",
+        "input_cost_per_1k": float(os.getenv("AOAI_LARGE_INPUT_COST_PER_1K", 0.0025)),
+        "output_cost_per_1k": float(os.getenv("AOAI_LARGE_OUTPUT_COST_PER_1K", 0.01)),
+        "rpm": int(os.getenv("AOAI_LARGE_REQUESTS_PER_MINUTE", os.getenv("AOAI_REQUESTS_PER_MINUTE", 300))),
+        "tpm": int(os.getenv("AOAI_LARGE_TOKENS_PER_MINUTE", os.getenv("AOAI_TOKENS_PER_MINUTE", 150000))),
+    },
+    "small": {
+        "deployment_env": "AOAI_SMALL_DEPLOYMENT",
+        "input_cost_per_1k": float(os.getenv("AOAI_SMALL_INPUT_COST_PER_1K", 0.00015)),
+        "output_cost_per_1k": float(os.getenv("AOAI_SMALL_OUTPUT_COST_PER_1K", 0.0006)),
+        "rpm": int(os.getenv("AOAI_SMALL_REQUESTS_PER_MINUTE", os.getenv("AOAI_REQUESTS_PER_MINUTE", 300))),
+        "tpm": int(os.getenv("AOAI_SMALL_TOKENS_PER_MINUTE", os.getenv("AOAI_TOKENS_PER_MINUTE", 150000))),
+    },
+}
+# Model routing: the tier, completion cap (max_tokens, None = no cap) and request timeout in
+# seconds used by each LLM-calling node. Small models handle the cheap structured tasks,
+# the large model writes and reviews the report text.
+MODEL_ROUTING = {
+    "generate_section_list": {"tier": "small", "max_tokens": 4000, "timeout": 60},
+    "generate_queries": {"tier": "small", "max_tokens": 500, "timeout": 30},
+    "write_section": {"tier": "large", "max_tokens": None, "timeout": 120},
+    "evaluate_research": {"tier": "small", "max_tokens": 800, "timeout": 60},
+    "review_section": {"tier": "large", "max_tokens": None, "timeout": 120},
+    "write_introduction": {"tier": "large", "max_tokens": 1500, "timeout": 90},
+    "write_conclusion": {"tier": "large", "max_tokens": 1500, "timeout": 90},
+}
+
+# Report job service (server.py): concurrent report runs (also batch.py's default concurrency),
+# jobs allowed to wait for a worker before submissions are rejected, finished jobs kept for
+# status polling, and where PDFs go (also the default output directory of batch.py and main.py)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", 50))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", 1000))
+REPORT_OUTPUT_DIR = os.getenv("REPORT_OUTPUT_DIR", "reports")
+
+# Rate limit settings: defaults for deployments outside MODEL_TIERS, and Tavily search
+AOAI_REQUESTS_PER_MINUTE = int(os.getenv("AOAI_REQUESTS_PER_MINUTE", 300))
+AOAI_TOKENS_PER_MINUTE = int(os.getenv("AOAI_TOKENS_PER_MINUTE", 150000))
+TAVILY_QUERIES_PER_SECOND = float(os.getenv("TAVILY_QUERIES_PER_SECOND", 5))
+# Retries of transient Azure OpenAI errors (connection, timeout, 429, 5xx), with exponential backoff
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF_SECONDS = 1.0
+# Completion tokens reserved up front for each LLM call until the real usage is known
+LLM_COMPLETION_TOKEN_ESTIMATE = 1000
 
 report_structure = """
 
@@ -238,6 +367,61 @@ Structure:
 """
 
 
+research_revision_prompt="""You are a researcher tasked with writing a section of a report. You will be given the background info such as the report topic, 
+the specific section of the report we are researching, the current draft of the section, and new research material. 
+
+The overall topic of the report is:
+
+{topic}
+
+Your specific section to write about is as follows: 
+
+{section_name}
+{section_description}
+
+Here is the current draft of the section (might be blank if first attempt):
+
+{section_content}
+
+Please use the following new information to revise this section of the report:
+
+{research_material}
+
+<end research material>
+
+Produce ONE complete, revised version of the section that merges the new information into the current draft. It replaces the current draft entirely.
+
+Revision rules:
+- Keep every distinct fact and citation from the current draft unless the new information corrects it
+- Each point should appear only once: merge overlapping statements instead of repeating them
+- Keep the entire section under {max_tokens} tokens; when space runs short, cut the least important details first
+
+Guidelines for writing:
+
+Style:
+- No marketing language
+- Technical focus
+- Start with your most important insight in **bold**
+
+Structure:
+- Write in valid markdown syntax
+- Only use the information provided. 
+- Use ## for section title (Markdown format)
+- Use structural elements ONLY IF they helps clarify your point:
+  * A focused table comparing 2-3 key items (using Markdown table syntax)
+  * A short list (3-5 items) using proper Markdown list syntax:
+    - Use `*` or `-` for unordered lists
+    - Use `1.` for ordered lists
+    - Ensure proper indentation and spacing
+- Cite your sources and then list them at the bottom of your response. You can include citations like [1], [2], etc in the text, then cite at the bottom.
+- Number the citations consistently across the merged draft
+- End with a single ### Sources list that references all the source material used, formatted as:
+  * List each source with title, date, and URL
+  * Format: `- Title : URL`
+
+"""
+
+
 research_feedback_prompt="""You are a researcher tasked with evaluating the progress of information gathering for a report section. 
 You will be given the background info such as the report topic, the report outline, the specific section of the report we are researching, and the current progress thus far.
 Your job is to determine if we have sufficiently researched the section, or if we need to continue researching. If we have a thorough, comprehensive section, you should finalize it. 
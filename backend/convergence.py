@@ -0,0 +1,68 @@
+#convergence.py
+# Marginal-novelty signal used to decide whether a section's research loop has converged
+import re
+
+from near_duplicates import word_shingles
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9.%$-]*")
+
+
+def extract_facts(text: str) -> set:
+    """Returns the salient tokens that anchor facts: numbers and mid-sentence proper nouns.
+
+    Rephrasing a finding keeps its numbers and names, so a paraphrase adds no new facts.
+    """
+    facts = set()
+    for sentence in _SENTENCE_RE.split(text):
+        tokens = _TOKEN_RE.findall(sentence)
+        for position, token in enumerate(tokens):
+            token = token.rstrip(".-")
+            if not token:
+                continue
+            if any(char.isdigit() for char in token) or (position > 0 and token[0].isupper()):
+                facts.add(token.lower())
+    return facts
+
+
+def measure_novelty(previous_content: str, new_content: str, new_sources: int, duplicate_sources: int) -> dict:
+    """Measures how much one research attempt added over everything the section had before it.
+
+    The score is the mean of the fraction of retrieved sources that were new, the
+    fraction of the new draft's word shingles not present before, and the fraction
+    of its facts (see extract_facts) not mentioned before.
+    """
+    retrieved = new_sources + duplicate_sources
+    url_novelty = new_sources / retrieved if retrieved else 0.0
+
+    previous_shingles = word_shingles(previous_content)
+    new_shingles = word_shingles(new_content)
+    added_shingles = new_shingles - previous_shingles
+    shingle_novelty = len(added_shingles) / len(new_shingles) if new_shingles else 0.0
+
+    previous_facts = extract_facts(previous_content)
+    new_facts = extract_facts(new_content)
+    added_facts = new_facts - previous_facts
+    fact_novelty = len(added_facts) / len(new_facts) if new_facts else 0.0
+
+    return {
+        "new_urls": new_sources,
+        "new_shingles": len(added_shingles),
+        "new_facts": len(added_facts),
+        "score": round((url_novelty + shingle_novelty + fact_novelty) / 3, 3),
+    }
+
+
+def convergence_decision(novelty_history: list, low_threshold: float, high_threshold: float):
+    """Returns "finalize" or "continue" when the novelty signal is decisive, or None to ask the LLM judge.
+
+    The first attempt has no baseline (everything is new), so it always goes to the judge.
+    """
+    if len(novelty_history) < 2:
+        return None
+    score = novelty_history[-1]["score"]
+    if score < low_threshold:
+        return "finalize"
+    if score > high_threshold:
+        return "continue"
+    return None
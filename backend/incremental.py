@@ -0,0 +1,57 @@
+#incremental.py
+# Content-hash store used to reuse sections, introductions and conclusions across report runs
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+def section_fingerprint(topic: str, name: str, description: str, research: bool) -> str:
+    """Fingerprints a section by everything that influences how it is researched and written."""
+    payload = json.dumps([topic.strip(), name.strip(), description.strip(), bool(research)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def body_fingerprint(topic: str, report_body: str) -> str:
+    """Fingerprints the consolidated report body that the introduction and conclusion are written from."""
+    payload = json.dumps([topic.strip(), report_body])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IncrementalStore:
+    """SQLite store of completed section content and intro/conclusion text keyed by fingerprint."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "kind TEXT NOT NULL, fingerprint TEXT NOT NULL, content TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (kind, fingerprint))"
+        )
+        self._conn.commit()
+
+    def get(self, kind: str, fingerprint: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM artifacts WHERE kind = ? AND fingerprint = ?", (kind, fingerprint)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, kind: str, fingerprint: str, content: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (kind, fingerprint, content, updated_at) VALUES (?, ?, ?, ?)",
+                (kind, fingerprint, content, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
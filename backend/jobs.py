@@ -0,0 +1,213 @@
+#jobs.py
+# Bounded async worker pool that runs report jobs on a background event loop
+import asyncio
+import bisect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobRejected(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+
+class Job:
+    """One report request and its lifecycle timestamps."""
+
+    def __init__(self, params: dict):
+        self.id = str(uuid.uuid4())
+        self.params = params
+        self.status = QUEUED
+        self.error = None
+        self.result = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Seconds spent in each named phase of the run (e.g. graph, pdf)
+        self.phases = {}
+        # JSON metrics summary of the run, set by run_job when the job ends
+        self.metrics = None
+        # (event id, message) pairs for streaming clients, in order; readers wait on the condition.
+        # Token messages are dropped once the job finishes, so ids can have gaps afterwards.
+        self.events = []
+        self.next_event_id = 0
+        self.first_event_at = None
+        self._events_changed = threading.Condition()
+        self._task = None
+
+    def publish(self, message: dict):
+        """Appends a progress message and wakes up readers waiting in wait_events()."""
+        with self._events_changed:
+            if self.first_event_at is None:
+                self.first_event_at = time.time()
+            self.events.append((self.next_event_id, message))
+            self.next_event_id += 1
+            self._events_changed.notify_all()
+
+    def wait_events(self, since: int, timeout: float) -> list:
+        """Returns the (id, message) pairs with id >= since, waiting up to timeout seconds for new ones."""
+        with self._events_changed:
+            self._events_changed.wait_for(
+                lambda: self.next_event_id > since or self.status in FINISHED_STATUSES, timeout
+            )
+            return self.events[bisect.bisect_left(self.events, since, key=lambda event: event[0]):]
+
+    def compact_events(self):
+        """Drops token messages, which finished jobs no longer need (section_complete carries the text)."""
+        with self._events_changed:
+            self.events = [event for event in self.events if event[1]["type"] != "token"]
+
+    def timing(self) -> dict:
+        now = time.time()
+        timing = {"queue_seconds": round((self.started_at or now) - self.submitted_at, 3)}
+        if self.first_event_at is not None and self.started_at is not None:
+            timing["first_event_seconds"] = round(self.first_event_at - self.started_at, 3)
+        if self.started_at is not None:
+            timing["run_seconds"] = round((self.finished_at or now) - self.started_at, 3)
+        timing.update({f"{phase}_seconds": round(seconds, 3) for phase, seconds in self.phases.items()})
+        if self.finished_at is not None:
+            timing["total_seconds"] = round(self.finished_at - self.submitted_at, 3)
+        return timing
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "topic": self.params.get("topic"),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "timing": self.timing(),
+        }
+
+
+class JobManager:
+    """Runs submitted jobs with at most `workers` in flight on one long-lived event loop.
+
+    Submissions are rejected with JobRejected once `max_queued` jobs are waiting, so a
+    burst of requests cannot pile up unbounded work. run_job(job) is awaited on the
+    manager's loop and its return value stored as job.result; on_startup() (if given)
+    runs on that loop before the first job, e.g. to open shared clients.
+    """
+
+    def __init__(self, run_job, workers: int = 4, max_queued: int = 50, history_limit: int = 1000, on_startup=None):
+        self.run_job = run_job
+        self.workers = workers
+        self.max_queued = max_queued
+        self.history_limit = history_limit
+        self.on_startup = on_startup
+        self.loop = asyncio.new_event_loop()
+        self.rejected = 0
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+
+    def start(self):
+        """Starts the event loop thread and the workers; returns once they are ready."""
+        self._thread = threading.Thread(target=self.loop.run_forever, name="report-jobs", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_workers(), self.loop).result()
+
+    async def _start_workers(self):
+        if self.on_startup is not None:
+            await self.on_startup()
+        self._queue = asyncio.Queue()
+        for _ in range(self.workers):
+            self.loop.create_task(self._worker())
+
+    def submit(self, params: dict) -> Job:
+        """Queues a job, or raises JobRejected when max_queued jobs are already waiting."""
+        with self._lock:
+            if self._count(QUEUED) >= self.max_queued:
+                self.rejected += 1
+                raise JobRejected(f"{self.max_queued} jobs are already queued")
+            job = Job(params)
+            self._jobs[job.id] = job
+            self._prune()
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        """Cancels a queued or running job; returns the job, or None if it is unknown."""
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED_STATUSES:
+            # Decided on the loop thread, so it cannot race with a worker picking the job up
+            self.loop.call_soon_threadsafe(self._cancel_on_loop, job)
+        return job
+
+    def _cancel_on_loop(self, job: Job):
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)
+        elif job._task is not None:
+            job._task.cancel()
+
+    def _finish(self, job: Job, status: str, error: str = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        # Wake up streaming readers so they can see the job is over
+        job.publish({"type": "job_" + status, "error": error})
+        # Finished jobs stay in the history for a while; keep their event logs small
+        job.compact_events()
+
+    def _count(self, status: str) -> int:
+        return sum(job.status == status for job in self._jobs.values())
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.status != QUEUED:
+                # Cancelled while waiting
+                self._queue.task_done()
+                continue
+            job.status = RUNNING
+            job.started_at = time.time()
+            job._task = asyncio.ensure_future(self.run_job(job))
+            try:
+                job.result = await job._task
+                self._finish(job, SUCCEEDED)
+            except asyncio.CancelledError:
+                if not job._task.cancelled():
+                    raise
+                print(f"Job {job.id} cancelled")
+                self._finish(job, CANCELLED)
+            except Exception as e:
+                print(f"Job {job.id} failed: {e!r}")
+                self._finish(job, FAILED, str(e) or repr(e))
+            finally:
+                job._task = None
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.status in FINISHED_STATUSES]
+            run_times = [job.finished_at - job.started_at for job in finished if job.started_at is not None]
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "queued": self._count(QUEUED),
+                "running": self._count(RUNNING),
+                "succeeded": self._count(SUCCEEDED),
+                "failed": self._count(FAILED),
+                "cancelled": self._count(CANCELLED),
+                "rejected": self.rejected,
+                "mean_run_seconds": round(sum(run_times) / len(run_times), 3) if run_times else 0.0,
+            }
@@ -1,37 +1,51 @@
 #main.py
 # Imports
 import asyncio
-from langchain_openai import AzureChatOpenAI
+import argparse
+import functools
+import inspect
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from typing_extensions import TypedDict
 import langgraph
 from typing import List, Annotated, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 import operator
 import langsmith
-from tavily import TavilyClient, AsyncTavilyClient
 
 from langchain_core.runnables import RunnableConfig
+from langchain_core.callbacks.manager import adispatch_custom_event
 from langgraph.constants import Send
 from langgraph.graph import START, END, StateGraph
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+import aiosqlite
 from langsmith import traceable
 from dataclasses import dataclass, field, fields
 from typing import Any
 
-from markdown import markdown
-from bs4 import BeautifulSoup
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import PageBreak
-
+# The OpenAI, Tavily and PDF libraries are imported on first use (see create_llm,
+# get_tavily_client and render_pdf) so that importing this module stays fast
 
 from configs import *
-from create_pdf import markdown_to_pdf_enhanced
+from search_cache import SearchCache, make_search_cache_key, make_extract_cache_key
+from rate_limiter import RateLimitScheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from incremental import IncrementalStore, section_fingerprint, body_fingerprint
+from source_packing import pack_sources, count_tokens, flatten_search_results, rank_sources
+from near_duplicates import NearDuplicateFilter
+from chunk_index import format_chunks
+from research_pool import get_research_pool, release_research_pool
+from query_dedupe import QueryDeduper
+from speculation import SpeculationRegistry, record_llm_usage
+from convergence import measure_novelty, convergence_decision
+from telemetry import ModelUsageTracker, EventCounter, MetricsRegistry, current_labels, set_labels, reset_labels
+from outline_parser import parse_report_structure
+from streaming_json import StreamingJsonParser
 
 # Environment and Configuration Setup
 load_dotenv()
@@ -40,6 +54,8 @@ load_dotenv()
 aoai_deployment = os.getenv("AOAI_DEPLOYMENT")
 aoai_key = os.getenv("AOAI_KEY")
 aoai_endpoint = os.getenv("AOAI_ENDPOINT")
+# Model behind the deployment, used to pick the matching tokenizer
+tokenizer_model = os.getenv("AOAI_MODEL_NAME", aoai_deployment)
 
 # Other environment variables
 LANGCHAIN_TRACING_V2 = os.getenv("LANGCHAIN_TRACING_V2")
@@ -48,20 +64,135 @@ LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY")
 LANGCHAIN_PROJECT = os.getenv("LANGCHAIN_PROJECT")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-# Client Initializations
-llm = AzureChatOpenAI(
-    azure_deployment=aoai_deployment,
-    api_version="2024-08-01-preview",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    api_key=aoai_key,
-    azure_endpoint=aoai_endpoint
+# Deployment behind each model tier (see MODEL_TIERS / MODEL_ROUTING in configs.py)
+tier_deployments = {
+    tier: os.getenv(settings["deployment_env"]) or aoai_deployment
+    for tier, settings in MODEL_TIERS.items()
+}
+
+# Client Initializations (clients are created on first use and cached)
+def create_llm(deployment: str, max_tokens: Optional[int], timeout: Optional[float]):
+    """Creates the chat client for one deployment with a given completion cap and timeout"""
+    from langchain_openai import AzureChatOpenAI
+    return AzureChatOpenAI(
+        azure_deployment=deployment,
+        api_version="2024-08-01-preview",
+        temperature=0,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        # Retried in call_llm so retries are counted
+        max_retries=0,
+        api_key=aoai_key,
+        azure_endpoint=aoai_endpoint
+    )
+
+# Chat clients by (deployment, max_tokens, timeout), created on first use
+llm_clients = {}
+
+def get_llm(node: str):
+    """Returns (deployment, client) for the model tier MODEL_ROUTING assigns to node"""
+    route = MODEL_ROUTING[node]
+    deployment = tier_deployments[route["tier"]]
+    key = (deployment, route["max_tokens"], route["timeout"])
+    if key not in llm_clients:
+        llm_clients[key] = create_llm(*key)
+    return deployment, llm_clients[key]
+
+tavily_async_client = None
+
+def get_tavily_client():
+    """Returns the shared async Tavily client, creating it on first use"""
+    global tavily_async_client
+    if tavily_async_client is None:
+        from tavily import AsyncTavilyClient
+        tavily_async_client = AsyncTavilyClient()
+    return tavily_async_client
+
+# Search result cache shared by every research subgraph run
+search_cache = None
+
+def get_search_cache():
+    """Returns the shared search cache, opening its SQLite file on first use"""
+    global search_cache
+    if search_cache is None:
+        search_cache = SearchCache(
+            path=SEARCH_CACHE_PATH,
+            ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+            max_memory_entries=SEARCH_CACHE_MAX_MEMORY_ENTRIES,
+            max_disk_entries=SEARCH_CACHE_MAX_DISK_ENTRIES
+        )
+    return search_cache
+
+# Content-hash store backing incremental report regeneration
+incremental_store = None
+
+def get_incremental_store():
+    """Returns the shared incremental store, opening its SQLite file on first use"""
+    global incremental_store
+    if incremental_store is None:
+        incremental_store = IncrementalStore(INCREMENTAL_STORE_PATH)
+    return incremental_store
+
+def render_pdf(markdown_text: str, output_filename: str):
+    """Renders a markdown report to PDF, loading the PDF renderer on first use"""
+    from create_pdf import markdown_to_pdf_enhanced
+    markdown_to_pdf_enhanced(markdown_text, output_filename)
+
+def warm_up():
+    """Creates every routed LLM client, the Tavily client, the local stores and the PDF renderer ahead of the first report"""
+    for node in MODEL_ROUTING:
+        get_llm(node)
+    get_tavily_client()
+    get_search_cache()
+    get_incremental_store()
+    import create_pdf
+
+# Rate limit scheduler shared by every LLM and search call
+rate_limiter = RateLimitScheduler(
+    default_rpm=AOAI_REQUESTS_PER_MINUTE,
+    default_tpm=AOAI_TOKENS_PER_MINUTE,
+    search_qps=TAVILY_QUERIES_PER_SECOND
 )
 
-tavily_client = TavilyClient()
-tavily_async_client = AsyncTavilyClient()
+def configure_tier_limits():
+    """Gives each tier's deployment the RPM/TPM quota from MODEL_TIERS (the first tier wins on a shared deployment)"""
+    for tier, settings in reversed(list(MODEL_TIERS.items())):
+        rate_limiter.configure_llm(tier_deployments[tier], settings["rpm"], settings["tpm"])
+
+configure_tier_limits()
+
+# Speculative branches of the research loop, keyed by speculation_key()
+speculations = SpeculationRegistry()
+
+# Latency and cost of every LLM call, per node and deployment
+model_usage = ModelUsageTracker({
+    tier_deployments[tier]: (settings["input_cost_per_1k"], settings["output_cost_per_1k"])
+    for tier, settings in MODEL_TIERS.items()
+})
+
+# Which path each node took (e.g. deterministic vs LLM outline parsing)
+node_paths = EventCounter()
+
+# Graph node, LLM and search instrumentation, labeled by report, section and attempt
+metrics = MetricsRegistry()
+metrics.describe("report_node_seconds", "summary", "Wall time of graph node executions")
+metrics.describe("report_llm_seconds", "summary", "Wall time of LLM calls, excluding rate limit queueing")
+metrics.describe("report_llm_queue_seconds", "summary", "Time LLM calls waited for rate limit budget")
+metrics.describe("report_llm_tokens_total", "counter", "LLM tokens by kind (prompt or completion)")
+metrics.describe("report_llm_cost_total", "counter", "Estimated LLM cost from MODEL_TIERS prices")
+metrics.describe("report_llm_retries_total", "counter", "LLM call retries after transient API errors")
+metrics.describe("report_search_seconds", "summary", "Wall time of Tavily search and extract calls")
+metrics.describe("report_search_queue_seconds", "summary", "Time search calls waited for rate limit budget")
+metrics.describe("report_search_cache_total", "counter", "Search and extract cache lookups by result (hit or miss)")
+
+@functools.lru_cache(maxsize=None)
+def retryable_llm_errors() -> tuple:
+    """Transient API errors that call_llm retries (timeouts are a subclass of APIConnectionError)
+
+    Only evaluated when a call raises, so the openai package is not imported up front.
+    """
+    import openai
+    return (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
 
 # Data Models/Schemas
 class FeedbackResponse(BaseModel):
@@ -76,6 +207,7 @@ class ReasoningResponse(BaseModel):
     answer: str
 
 class ReportState(TypedDict):
+    report_id: str
     topic: str
     report_structure: str
     sections: List[str]
@@ -102,6 +234,7 @@ class SearchQueries(BaseModel):
 
 
 class ResearchState(TypedDict):
+    report_id: str
     topic: str
     report_structure: str
     section: Section
@@ -109,6 +242,12 @@ class ResearchState(TypedDict):
     feedback: FeedbackResponse
     iteration_counter: int
     completed_sections: list[Section]
+    # URL/content sketches of sources already used by earlier attempts of this section
+    seen_sources: list
+    # Marginal novelty (new URLs, shingles and facts) added by each attempt
+    novelty: list
+    # Prompt tokens spent by each attempt, per LLM call
+    prompt_tokens: list
 
 class ResearchOutputState(TypedDict):
     completed_sections: list[Section]
@@ -116,64 +255,123 @@ class ResearchOutputState(TypedDict):
 
 
 # Report Generation Functions
-def generate_report_structure(state: ReportState):
+def generate_report_structure(state: ReportState, config: RunnableConfig):
     """Generates the report structure"""
     print("Generating report structure for user input: \n\n", state['topic'])
     #state["report_structure"] = report_structure
-    return {'report_structure': state["report_structure"]}
+    # Report-scoped resources (e.g. the chunk index) are keyed by this id
+    report_id = state.get('report_id') or get_setting(config, "thread_id", None) or str(uuid.uuid4())
+    return {'report_structure': state["report_structure"], 'report_id': report_id}
 
-def generate_section_list(state: ReportState):
+async def generate_section_list(state: ReportState, config: RunnableConfig):
     """Generates the list of sections"""
-    structured_llm = llm.with_structured_output(Sections)
+    # Well-formed structures are parsed directly; the LLM only handles free-form ones
+    parsed = None
+    if get_setting(config, "outline_fast_path", OUTLINE_FAST_PATH):
+        parsed = parse_report_structure(state['report_structure'])
+
+    incremental = get_setting(config, "incremental", INCREMENTAL_MODE)
+    if parsed is not None:
+        print(f"Parsed {len(parsed)} sections from the report structure without the LLM")
+        node_paths.increment("generate_section_list", "deterministic")
+        state["sections"] = [Section(content="", **section) for section in parsed]
+    elif pipelined_fanout(config):
+        node_paths.increment("generate_section_list", "llm")
+        return await stream_section_list(state, config, incremental)
+    else:
+        node_paths.increment("generate_section_list", "llm")
+        sections = await call_llm(
+            section_list_messages(state), "generate_section_list", schema=Sections, priority=PRIORITY_HIGH
+        )
+        state["sections"] = sections.sections
+
+    if not incremental:
+        return {'sections': state["sections"]}
+
+    reused_sections = [section for section in state["sections"] if reuse_section(state, section)]
+    print(f"Incremental mode: reusing {len(reused_sections)} of {len(state['sections'])} sections")
+    return {'sections': state["sections"], 'completed_sections': reused_sections}
+
+async def stream_section_list(state: ReportState, config: RunnableConfig, incremental: bool):
+    """Streams the section list from the LLM, researching each section as soon as its JSON object closes"""
+    sections, reused_sections, research_tasks = [], [], []
+    try:
+        async for path, value in stream_structured_llm(
+            section_list_messages(state), "generate_section_list", Sections, priority=PRIORITY_HIGH
+        ):
+            if len(path) != 2 or path[0] != "sections":
+                continue
+            section = Section.model_validate(value)
+            sections.append(section)
+            if incremental and reuse_section(state, section):
+                reused_sections.append(section)
+                continue
+            print(f"Section ```{section.name}``` parsed, starting research")
+            research_tasks.append(asyncio.ensure_future(
+                pipelined_research_agent.ainvoke(research_input(state, section), config)
+            ))
+        results = await asyncio.gather(*research_tasks)
+    except BaseException:
+        for task in research_tasks:
+            task.cancel()
+        raise
+
+    if incremental:
+        print(f"Incremental mode: reusing {len(reused_sections)} of {len(sections)} sections")
+    completed_sections = reused_sections + [
+        section for result in results for section in result["completed_sections"]
+    ]
+    return {'sections': sections, 'completed_sections': completed_sections}
+
+def section_list_messages(state: ReportState) -> list:
     section_generation_system_prompt = section_generation_prompt.format(
         topic=state['topic'], 
         report_structure=state['report_structure'], 
         context=""
     )
-    sections = structured_llm.invoke([
+    return [
         SystemMessage(content=section_generation_system_prompt)
-    ] + [HumanMessage(content="Populate the sections")])
-    state["sections"] = sections.sections
-    return {'sections': state["sections"]}
+    ] + [HumanMessage(content="Populate the sections")]
+
+def reuse_section(state: ReportState, section: Section) -> bool:
+    """Loads a section's content from a previous run if its fingerprint matches (incremental mode)"""
+    content = get_incremental_store().get("section", section_fingerprint(
+        state['topic'], section.name, section.description, section.research
+    ))
+    if content is None:
+        return False
+    section.content = content
+    return True
 
 
 # Utility Functions
-def deduplicate_and_format_sources(search_response, max_tokens_per_source, include_raw_content=True):
-    """Takes either a single search response or list of responses from Tavily API and formats them."""
-    # [Function implementation remains the same]
-    if isinstance(search_response, dict):
-        sources_list = search_response['results']
-    elif isinstance(search_response, list):
-        sources_list = []
-        for response in search_response:
-            if isinstance(response, dict) and 'results' in response:
-                sources_list.extend(response['results'])
-            else:
-                sources_list.extend(response)
-    else:
-        raise ValueError("Input must be either a dict with 'results' or a list of search results")
-    
-    unique_sources = {}
-    for source in sources_list:
-        if source['url'] not in unique_sources:
-            unique_sources[source['url']] = source
-    
-    formatted_text = "Sources:\n\n"
-    for i, source in enumerate(unique_sources.values(), 1):
-        formatted_text += f"Source {source['title']}:\n===\n"
-        formatted_text += f"URL: {source['url']}\n===\n"
-        formatted_text += f"Most relevant content from source: {source['content']}\n===\n"
-        if include_raw_content:
-            char_limit = max_tokens_per_source * 4
-            raw_content = source.get('raw_content', '')
-            if raw_content is None:
-                raw_content = ''
-                print(f"Warning: No raw_content found for source {source['url']}")
-            if len(raw_content) > char_limit:
-                raw_content = raw_content[:char_limit] + "... [truncated]"
-            formatted_text += f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
-                
-    return formatted_text.strip()
+def get_setting(config: Optional[RunnableConfig], key: str, default):
+    """Reads an opt-in setting from the run's configurable, falling back to the configs.py default"""
+    if config:
+        return config.get("configurable", {}).get(key, default)
+    return default
+
+def pipelined_fanout(config: Optional[RunnableConfig]) -> bool:
+    """Whether to research sections while the section list streams (see PIPELINED_FANOUT)
+
+    Off by default for checkpointed runs: the pipelined sections run inside generate_section_list,
+    so a crash there would lose every finished section and a resume would research them all again.
+    """
+    setting = get_setting(config, "pipelined_fanout", None)
+    if setting is not None:
+        return setting
+    return PIPELINED_FANOUT and get_setting(config, "thread_id", None) is None
+
+async def emit_progress(name: str, data: dict):
+    """Publishes a custom progress event to astream_events consumers (no-op outside a graph run)"""
+    try:
+        await adispatch_custom_event(name, data)
+    except RuntimeError:
+        pass
+
+def speculation_key(state) -> tuple:
+    """Identifies one research attempt of one section of one report"""
+    return (state['report_id'], state['section'].name, state['iteration_counter'])
 
 def format_sections(sections: list[Section]) -> str:
     """ Format a list of sections into a string """
@@ -194,72 +392,280 @@ Content:
 """
     return formatted_str
 
-# Research and feedback Functions
-@traceable(run_type="retriever", name="tavily_web_search")
-async def tavily_search_async(query, tavily_topic="general", tavily_days=None):
-    """Performs a single web search using the Tavily API."""
-    # [Function implementation remains the same]
-    if tavily_topic == "news":
-        return await tavily_async_client.search(
-            query,
-            max_results=5,
-            include_raw_content=True,
-            topic="news",
-            days=tavily_days
-        )
-    else:
-        return await tavily_async_client.search(
-            query,
-            max_results=5,
-            include_raw_content=True,
-            topic="general"
-        )
+def estimate_message_tokens(messages) -> int:
+    """Token estimate for a list of chat messages using the deployment's tokenizer"""
+    text = "".join(m["content"] if isinstance(m, dict) else m.content for m in messages)
+    return count_tokens(text, tokenizer_model) + 4 * len(messages)
+
+def record_llm_call(node, deployment, seconds, queue_wait, usage=None, error=False):
+    """Accounts one LLM call in the speculation, per-model and labeled metrics trackers"""
+    input_tokens = usage["input_tokens"] if usage else 0
+    output_tokens = usage["output_tokens"] if usage else 0
+    record_llm_usage(usage["total_tokens"] if usage else None)
+    model_usage.record(node, deployment, seconds, queue_wait, input_tokens, output_tokens, error=error)
+
+    labels = {"call": node, "deployment": deployment, **current_labels()}
+    metrics.observe("report_llm_seconds", seconds, status="error" if error else "ok", **labels)
+    metrics.observe("report_llm_queue_seconds", queue_wait, **labels)
+    metrics.inc("report_llm_tokens_total", input_tokens, kind="prompt", **labels)
+    metrics.inc("report_llm_tokens_total", output_tokens, kind="completion", **labels)
+    metrics.inc("report_llm_cost_total", model_usage.cost(deployment, input_tokens, output_tokens), **labels)
+
+async def retry_backoff(node: str, deployment: str, retry: int, error: Exception):
+    """Records a retry of a transient LLM error and waits before the next try"""
+    print(f"LLM call {node} failed ({error!r}), retrying ({retry + 1} of {LLM_MAX_RETRIES})")
+    metrics.inc("report_llm_retries_total", call=node, deployment=deployment, **current_labels())
+    await asyncio.sleep(LLM_RETRY_BACKOFF_SECONDS * 2 ** retry)
+
+async def call_llm(messages, node, schema=None, run_name=None, priority=PRIORITY_NORMAL, max_tokens=None):
+    """Calls the model routed to node through the rate limit scheduler, optionally with structured output"""
+    deployment, client = get_llm(node)
+    runnable = client.with_structured_output(schema, include_raw=True) if schema else client
+    if max_tokens and not schema:
+        runnable = runnable.bind(max_tokens=max_tokens)
+    if run_name:
+        runnable = runnable.with_config({"run_name": run_name})
+
+    # Every try takes its own slot, so retries queue behind other work by priority and are charged
+    # to the token budget; the backoff waits outside the slot so it does not hold the budget
+    estimated_tokens = estimate_message_tokens(messages) + LLM_COMPLETION_TOKEN_ESTIMATE
+    for retry in range(LLM_MAX_RETRIES + 1):
+        async with rate_limiter.llm_slot(deployment, estimated_tokens, priority) as slot:
+            start = time.perf_counter()
+            try:
+                response = await runnable.ainvoke(messages)
+            except Exception as e:
+                record_llm_call(node, deployment, time.perf_counter() - start, slot["queue_wait"], error=True)
+                if not isinstance(e, retryable_llm_errors()) or retry == LLM_MAX_RETRIES:
+                    raise
+                error = e
+            else:
+                raw = response["raw"] if schema else response
+                usage = getattr(raw, "usage_metadata", None)
+                if usage:
+                    slot["actual_tokens"] = usage["total_tokens"]
+                record_llm_call(node, deployment, time.perf_counter() - start, slot["queue_wait"], usage)
+                break
+        await retry_backoff(node, deployment, retry, error)
+
+    if schema:
+        if response["parsing_error"] is not None:
+            raise response["parsing_error"]
+        return response["parsed"]
+    return response
+
+async def stream_structured_llm(messages, node, schema, run_name=None, priority=PRIORITY_NORMAL):
+    """Streams a structured LLM call, yielding (path, value) for each JSON value as soon as it closes
+
+    The schema is forced as a tool call so its arguments arrive as incremental JSON text;
+    see StreamingJsonParser for the event format. The last event is ((), full document).
+    Transient errors are retried only until the first output arrives.
+    """
+    deployment, client = get_llm(node)
+    runnable = client.bind_tools([schema], tool_choice=schema.__name__)
+    if run_name:
+        runnable = runnable.with_config({"run_name": run_name})
+
+    parser = StreamingJsonParser()
+    prompt_tokens = estimate_message_tokens(messages)
+    for retry in range(LLM_MAX_RETRIES + 1):
+        # Like call_llm, every try takes its own slot and the backoff waits outside it
+        async with rate_limiter.llm_slot(deployment, prompt_tokens + LLM_COMPLETION_TOKEN_ESTIMATE, priority) as slot:
+            start = time.perf_counter()
+            usage, failed, error = None, True, None
+            chunks = runnable.astream(messages, stream_usage=True)
+            try:
+                async for chunk in chunks:
+                    if chunk.usage_metadata:
+                        usage = chunk.usage_metadata
+                    for tool_call_chunk in chunk.tool_call_chunks:
+                        for event in parser.feed(tool_call_chunk.get("args") or ""):
+                            yield event
+                if not parser.done:
+                    raise ValueError(f"Streamed {schema.__name__} output ended before the JSON document was complete")
+                failed = False
+            except retryable_llm_errors() as e:
+                if parser.buffer or retry == LLM_MAX_RETRIES:
+                    raise
+                error = e
+            except GeneratorExit:
+                # The caller stopped consuming early (e.g. once a decisive field arrived)
+                failed = False
+                raise
+            finally:
+                # Closing the model stream cancels the rest of the generation
+                await chunks.aclose()
+                if usage is None and parser.buffer:
+                    # Usage is only reported at the end of the stream, so estimate it for cancelled generations
+                    output_tokens = count_tokens(parser.buffer, tokenizer_model)
+                    usage = {"input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                             "total_tokens": prompt_tokens + output_tokens}
+                if usage:
+                    slot["actual_tokens"] = usage["total_tokens"]
+                record_llm_call(node, deployment, time.perf_counter() - start, slot["queue_wait"], usage, error=failed)
+        if error is None:
+            return
+        await retry_backoff(node, deployment, retry, error)
+
+@functools.lru_cache(maxsize=None)
+def ordered_schema(schema):
+    """Returns a copy of schema whose fields follow STRUCTURED_FIELD_ORDER, so the model emits them in that order"""
+    order = STRUCTURED_FIELD_ORDER.get(schema.__name__)
+    if not order:
+        return schema
+    names = [name for name in order if name in schema.model_fields]
+    names += [name for name in schema.model_fields if name not in names]
+    return create_model(
+        schema.__name__,
+        __doc__=schema.__doc__,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names}
+    )
+
+async def call_llm_early_exit(messages, node, schema, decisive_field, needs_rest, run_name=None, priority=PRIORITY_NORMAL):
+    """Streams a structured LLM call and stops generating once decisive_field settles the outcome
+
+    needs_rest(value) tells whether the remaining fields are still needed once decisive_field
+    has been decoded; if not, the generation is cancelled and fields that were not generated
+    yet are filled with a placeholder.
+    """
+    fields, early_exit = {}, False
+    stream = stream_structured_llm(messages, node, ordered_schema(schema), run_name, priority)
+    try:
+        async for path, value in stream:
+            if path == ():
+                fields = value
+            elif len(path) == 1:
+                fields[path[0]] = value
+                if path[0] == decisive_field and not needs_rest(value):
+                    early_exit = len(fields) < len(schema.model_fields)
+                    break
+    finally:
+        await stream.aclose()
+
+    node_paths.increment(node, "early_exit" if early_exit else "full_generation")
+    for name in schema.model_fields:
+        fields.setdefault(name, f"(not generated: stopped once {decisive_field} was decoded)")
+    return schema.model_validate(fields)
+
+def record_search(kind: str, seconds: float, queue_wait: float, status: str):
+    labels = {"kind": kind, **current_labels()}
+    metrics.observe("report_search_seconds", seconds, status=status, **labels)
+    metrics.observe("report_search_queue_seconds", queue_wait, **labels)
 
+# Research and feedback Functions
 @traceable(run_type="retriever", name="web_search")
-async def tavily_search_async(query: str, tavily_topic: str = "general", tavily_days: Optional[int] = None, timeout: int = 40):
-    """Performs a single web search using the Tavily API with timeout handling."""
+async def tavily_search_async(query: str, tavily_topic: str = "general", tavily_days: Optional[int] = None, include_raw_content: bool = True, timeout: int = 40):
+    """Performs a single web search using the Tavily API with caching and timeout handling."""
+    if tavily_topic != "news":
+        tavily_days = None
+    cache_key = make_search_cache_key(query, tavily_topic, tavily_days, include_raw_content)
+    cached = await get_search_cache().aget(cache_key)
+    metrics.inc("report_search_cache_total", kind="search", result="hit" if cached is not None else "miss", **current_labels())
+    if cached is not None:
+        return cached
+
+    queue_wait = await rate_limiter.search_slot()
+    start = time.perf_counter()
     try:
         if tavily_topic == "news":
-            return await asyncio.wait_for(
-                tavily_async_client.search(
+            result = await asyncio.wait_for(
+                get_tavily_client().search(
                     query,
                     max_results=5,
-                    include_raw_content=True,
+                    include_raw_content=include_raw_content,
                     topic="news",
                     days=tavily_days
                 ),
                 timeout=timeout
             )
         else:
-            return await asyncio.wait_for(
-                tavily_async_client.search(
+            result = await asyncio.wait_for(
+                get_tavily_client().search(
                     query,
                     max_results=5,
-                    include_raw_content=True,
+                    include_raw_content=include_raw_content,
                     topic="general"
                 ),
                 timeout=timeout
             )
     except asyncio.TimeoutError:
         print(f"Search for '{query}' timed out after {timeout} seconds")
+        record_search("search", time.perf_counter() - start, queue_wait, "timeout")
         return None
     except Exception as e:
         print(f"Error in search for '{query}': {str(e)}")
+        record_search("search", time.perf_counter() - start, queue_wait, "error")
         return None
-
-
-
-async def conduct_research(state: ResearchState):
-    """Conduct research for a section, with attempt tracking"""
-    # [Function implementation remains the same]
-    state['iteration_counter'] += 1
-    print(f"###Conducting research for section: ```{state['section'].name}``` --- (Attempt {state['iteration_counter']})###")
-
-    
-    structured_llm = llm.with_structured_output(SearchQueries)
-
-
-
+    record_search("search", time.perf_counter() - start, queue_wait, "ok")
+
+    for source in result.get('results', []):
+        if source.get('raw_content'):
+            source['raw_content'] = source['raw_content'][:MAX_RAW_CONTENT_CHARS]
+    await get_search_cache().aset(cache_key, result)
+    return result
+
+@traceable(run_type="retriever", name="web_extract")
+async def tavily_extract_async(urls: List[str], timeout: int = 40) -> dict:
+    """Fetches the full content of the given URLs using the Tavily API, returning {url: raw_content}."""
+    contents = {}
+    missing = []
+    for url in urls:
+        cached = await get_search_cache().aget(make_extract_cache_key(url))
+        if cached is not None:
+            contents[url] = cached
+        else:
+            missing.append(url)
+    labels = current_labels()
+    metrics.inc("report_search_cache_total", len(urls) - len(missing), kind="extract", result="hit", **labels)
+    metrics.inc("report_search_cache_total", len(missing), kind="extract", result="miss", **labels)
+    if not missing:
+        return contents
+
+    queue_wait = await rate_limiter.search_slot()
+    start = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(get_tavily_client().extract(urls=missing), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"Extract for {len(missing)} URLs timed out after {timeout} seconds")
+        record_search("extract", time.perf_counter() - start, queue_wait, "timeout")
+        return contents
+    except Exception as e:
+        print(f"Error extracting {len(missing)} URLs: {str(e)}")
+        record_search("extract", time.perf_counter() - start, queue_wait, "error")
+        return contents
+    record_search("extract", time.perf_counter() - start, queue_wait, "ok")
+
+    for item in response.get('results', []):
+        # Cap page size at ingestion so oversized pages never reach memory-resident state
+        raw_content = (item.get('raw_content') or '')[:MAX_RAW_CONTENT_CHARS]
+        contents[item['url']] = raw_content
+        await get_search_cache().aset(make_extract_cache_key(item['url']), raw_content)
+    return contents
+
+async def attach_raw_content(sources: list, pool, top_n: int) -> list:
+    """Second retrieval phase: attaches full page content to the top_n ranked sources only"""
+    to_fetch = []
+    for source in sources[:top_n]:
+        pooled = pool.sources.get(source['url'])
+        if not source.get('raw_content') and not (pooled and pooled.get('raw_content')):
+            to_fetch.append(source['url'])
+    fetched = await tavily_extract_async(to_fetch) if to_fetch else {}
+
+    enriched = []
+    for rank, source in enumerate(sources):
+        pooled = pool.sources.get(source['url'])
+        if rank < top_n and not source.get('raw_content'):
+            raw_content = fetched.get(source['url']) or (pooled.get('raw_content') if pooled else None)
+            if raw_content:
+                # Copy rather than mutate, since the source dict may be shared with the search cache
+                source = {**source, 'raw_content': raw_content}
+        enriched.append(source)
+    return enriched
+
+
+
+async def prepare_research(state: ResearchState, config: RunnableConfig) -> dict:
+    """Generates search queries for the next attempt, runs the searches and packs the research material"""
     system_prompt = research_query_prompt.format(
         topic=state['topic'],
         section_name=state['section'].name,
@@ -274,14 +680,47 @@ async def conduct_research(state: ResearchState):
     ]
 
     
-    response = structured_llm.with_config({"run_name": "Generate Search Queries"}).invoke(messages)
+    query_prompt_tokens = estimate_message_tokens(messages)
+    response = await call_llm(messages, "generate_queries", schema=SearchQueries, run_name="Generate Search Queries")
+
+    duplicate_filter = NearDuplicateFilter.from_state(state.get('seen_sources'), threshold=NEAR_DUPLICATE_THRESHOLD)
+    search_queries = list(state['search_queries'])
+
+    # Draw on material other sections of this report already retrieved before searching again
+    pool = get_research_pool(state['report_id'])
+    section_query = f"{state['section'].name} {state['section'].description}"
+    pooled_sources = [
+        source for source in pool.relevant_sources(
+            section_query, k=RESEARCH_TOP_K_CHUNKS, min_term_coverage=RESEARCH_POOL_MIN_TERM_COVERAGE
+        )
+        if not duplicate_filter.has_seen_url(source['url'])
+    ]
 
-    for query in response.queries:
+    # Skip queries that paraphrase ones this section (or, optionally, the whole report) already ran
+    history = list(search_queries)
+    if get_setting(config, "query_dedupe_report_scope", QUERY_DEDUPE_REPORT_SCOPE):
+        history += pool.queries()
+    queries, duplicate_queries = QueryDeduper(history, threshold=QUERY_DEDUPE_THRESHOLD).split(response.queries)
+    reused_results = []
+    for query, earlier_query in duplicate_queries:
+        print(f"Skipping search query '{query}' (near-duplicate of '{earlier_query}')")
+        earlier_result = pool.cached_result(earlier_query)
+        if earlier_result is not None and earlier_query not in search_queries:
+            reused_results.append(earlier_result)
+
+    if len(pooled_sources) >= RESEARCH_POOL_MIN_SOURCES:
+        queries = queries[:RESEARCH_POOL_REDUCED_QUERIES]
+        print(f"Research pool already has {len(pooled_sources)} relevant sources, issuing {len(queries)} new searches")
+
+    for query in queries:
         print("Search Query: ", query)
-        state['search_queries'].append(query)
+        search_queries.append(query)
+        await emit_progress("search_query", {"section": state['section'].name, "query": query})
 
+    # In two-phase mode the searches return snippets only; full content is fetched later for top sources
+    two_phase = get_setting(config, "two_phase_retrieval", TWO_PHASE_RETRIEVAL)
     search_results = await asyncio.gather(
-        *[tavily_search_async(query) for query in response.queries],
+        *[pool.search(query, lambda q: tavily_search_async(q, include_raw_content=not two_phase)) for query in queries],
         return_exceptions=True
     )
 
@@ -289,41 +728,147 @@ async def conduct_research(state: ResearchState):
     filtered_results = [
         result for result in search_results 
         if result is not None and not isinstance(result, Exception)
-    ]
-
-    research = deduplicate_and_format_sources(filtered_results, max_tokens_per_source=1000, include_raw_content=False)
+    ] + reused_results
+
+    # Drop near-duplicates of sources seen in this or any earlier attempt, keeping the most relevant copy
+    candidate_sources = rank_sources(flatten_search_results(filtered_results) + pooled_sources)
+    duplicate_count = 0
+    if two_phase:
+        # Snippets are query-dependent, so content duplicates are only detected once full pages are fetched
+        new_url_sources = duplicate_filter.drop_seen_urls(candidate_sources)
+        duplicate_count = len(candidate_sources) - len(new_url_sources)
+        candidate_sources = await attach_raw_content(new_url_sources, pool, top_n=RAW_CONTENT_FETCH_TOP_N)
+    unique_sources, duplicate_sources = duplicate_filter.filter(candidate_sources)
+    duplicate_count += len(duplicate_sources)
+    print(f"Dropped {duplicate_count} near-duplicate sources, keeping {len(unique_sources)}")
+
+    research, packing_stats = pack_sources(
+        [{"results": unique_sources}],
+        token_budget=RESEARCH_TOKEN_BUDGET,
+        max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
+        include_raw_content=False,
+        model_name=tokenizer_model
+    )
+    print(f"Packed {packing_stats['tokens_packed']} tokens from {packing_stats['sources_packed']} sources "
+          f"({packing_stats['sources_dropped']} sources / {packing_stats['tokens_dropped']} tokens dropped)")
+
+    # Share the new sources with the rest of the report and add only the best full-content passages
+    pool.add_sources(unique_sources)
+    chunks = pool.chunk_index.search(section_query, k=RESEARCH_TOP_K_CHUNKS)
+    if chunks:
+        research = research + "\n\n" + format_chunks(chunks)
     #print("Research: \n\n", research)
 
-    
-    system_prompt = research_writing_prompt.format(
-        topic=state['topic'],
-        section_name=state['section'].name,
-        section_description=state['section'].description,
-        section_content=state['section'].content,
-        research_material=research
-    )
+    return {
+        'research': research,
+        'search_queries': search_queries,
+        'seen_sources': duplicate_filter.to_state(),
+        'new_sources': len(unique_sources),
+        'duplicate_sources': duplicate_count,
+        'query_prompt_tokens': query_prompt_tokens
+    }
+
+async def conduct_research(state: ResearchState, config: RunnableConfig):
+    """Conduct research for a section, with attempt tracking"""
+    # Use the next round's research if it was already prepared speculatively during evaluation
+    prepared = await speculations.take(speculation_key(state), "continue")
+    state['iteration_counter'] += 1
+    print(f"###Conducting research for section: ```{state['section'].name}``` --- (Attempt {state['iteration_counter']})###")
+    if prepared is None:
+        prepared = await prepare_research(state, config)
+
+    revision_mode = get_setting(config, "revision_mode", SECTION_REVISION_MODE)
+    if revision_mode:
+        # Rewrite into one merged draft under the token cap instead of appending another draft
+        system_prompt = research_revision_prompt.format(
+            topic=state['topic'],
+            section_name=state['section'].name,
+            section_description=state['section'].description,
+            section_content=state['section'].content,
+            research_material=prepared['research'],
+            max_tokens=SECTION_MAX_TOKENS
+        )
+    else:
+        system_prompt = research_writing_prompt.format(
+            topic=state['topic'],
+            section_name=state['section'].name,
+            section_description=state['section'].description,
+            section_content=state['section'].content,
+            research_material=prepared['research']
+        )
 
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": "Please generate the content for the section"}
     ]
 
-    response = llm.invoke(messages)
+    writing_prompt_tokens = estimate_message_tokens(messages)
+    response = await call_llm(messages, "write_section", run_name="Write Section", max_tokens=SECTION_MAX_TOKENS if revision_mode else None)
 
-    state['section'].content += response.content
+    novelty = measure_novelty(
+        state['section'].content, response.content, prepared['new_sources'], prepared['duplicate_sources']
+    )
+    print(f"Attempt {state['iteration_counter']} novelty: {novelty}")
+    if revision_mode:
+        state['section'].content = response.content
+    else:
+        state['section'].content += response.content
+
+    prompt_tokens = {
+        "attempt": state['iteration_counter'],
+        "query": prepared['query_prompt_tokens'],
+        "writing": writing_prompt_tokens
+    }
+    print(f"Attempt {state['iteration_counter']} prompt tokens: {prompt_tokens}")
     
     return {
         'section': state['section'],
-        'search_queries': state['search_queries'],
-        'iteration_counter': state['iteration_counter']
+        'search_queries': prepared['search_queries'],
+        'iteration_counter': state['iteration_counter'],
+        'seen_sources': prepared['seen_sources'],
+        'novelty': state.get('novelty', []) + [novelty],
+        'prompt_tokens': state.get('prompt_tokens', []) + [prompt_tokens]
     }
 
-def evaluate_research(state: ResearchState):
+async def evaluate_research(state: ResearchState, config: RunnableConfig):
     """Evaluates the research conducted"""
     # [Function implementation remains the same]
     print("Evaluating research...")
 
-    structured_llm = llm.with_structured_output(FeedbackResponse)
+    # review_router finalizes at the attempt cap whatever the judge says, so don't ask it
+    if state['iteration_counter'] >= MAX_RESEARCH_ATTEMPTS:
+        print(f"Maximum attempts ({MAX_RESEARCH_ATTEMPTS}) reached, finalizing without evaluation")
+        return {'feedback': FeedbackResponse(
+            thought_process=f"Reached the maximum of {MAX_RESEARCH_ATTEMPTS} research attempts.",
+            answer="finalize"
+        )}
+
+    # Skip the LLM judge when the marginal novelty of the last attempt is decisive
+    if get_setting(config, "novelty_convergence", NOVELTY_CONVERGENCE):
+        decision = convergence_decision(state.get('novelty', []), NOVELTY_LOW_THRESHOLD, NOVELTY_HIGH_THRESHOLD)
+        novelty = state['novelty'][-1] if state.get('novelty') else None
+        if decision == "finalize":
+            print(f"Marginal novelty {novelty['score']} below {NOVELTY_LOW_THRESHOLD}, finalizing without evaluation")
+            return {'feedback': FeedbackResponse(
+                thought_process=f"The last attempt added little new material (novelty {novelty['score']}).",
+                answer="finalize"
+            )}
+        if decision == "continue":
+            print(f"Marginal novelty {novelty['score']} above {NOVELTY_HIGH_THRESHOLD}, continuing without evaluation")
+            return {'feedback': FeedbackResponse(
+                thought_process=(
+                    f"The last attempt still found substantial new material ({novelty['new_urls']} new sources, "
+                    f"{novelty['new_facts']} new facts). Keep researching aspects of the section not yet covered."
+                ),
+                answer="continue_research"
+            )}
+
+    speculative = get_setting(config, "speculative", SPECULATIVE_RESEARCH)
+    if speculative:
+        # Start both possible next steps now; review_router keeps one and cancels the other
+        key = speculation_key(state)
+        speculations.start(key, "continue", lambda: prepare_research(state, config))
+        speculations.start(key, "finalize", lambda: review_section(state, config))
 
     system_prompt = research_feedback_prompt.format(
         topic=state['topic'],
@@ -339,18 +884,34 @@ def evaluate_research(state: ResearchState):
     ]
 
     
-    feedback_response = structured_llm.with_config({"run_name": "Provide Feedback"}).invoke(messages)
+    try:
+        if get_setting(config, "early_exit", EARLY_EXIT_STRUCTURED):
+            # The thought process only matters when research continues (it steers the next queries)
+            feedback_response = await call_llm_early_exit(
+                messages, "evaluate_research", FeedbackResponse, "answer",
+                needs_rest=lambda answer: answer == "continue_research",
+                run_name="Provide Feedback"
+            )
+        else:
+            feedback_response = await call_llm(messages, "evaluate_research", schema=FeedbackResponse, run_name="Provide Feedback")
+    except BaseException:
+        # review_router will not run, so stop the speculative branches instead of leaving them calling APIs
+        if speculative:
+            speculations.discard(speculation_key(state))
+        raise
 
     print("Thought Process: ", feedback_response.thought_process)
     print("Answer: ", feedback_response.answer)
 
-    return {'feedback': feedback_response}
+    # Charge the judge's prompt to the attempt it evaluated
+    prompt_tokens = [dict(entry) for entry in state.get('prompt_tokens', [])]
+    if prompt_tokens:
+        prompt_tokens[-1]["evaluation"] = estimate_message_tokens(messages)
 
-def finalize_research(state: ResearchState):
-    """Finalizes the research"""
-    print("Finalizing research...")
-    structured_llm = llm.with_structured_output(ReasoningResponse)
+    return {'feedback': feedback_response, 'prompt_tokens': prompt_tokens}
 
+async def review_section(state: ResearchState, config: Optional[RunnableConfig] = None) -> ReasoningResponse:
+    """Asks the LLM to approve the section write-up or return a revised version"""
     system_prompt = final_approval_prompt.format(
         topic=state['topic'],
         section_name=state['section'].name,
@@ -364,7 +925,22 @@ def finalize_research(state: ResearchState):
         {"role": "user", "content": "Please review the write-up"}
     ]
 
-    response = structured_llm.with_config({"run_name": "Final Revisions & Approval"}).invoke(messages)
+    if get_setting(config, "early_exit", EARLY_EXIT_STRUCTURED):
+        # Only the answer (approval or the revised section) is used
+        return await call_llm_early_exit(
+            messages, "review_section", ReasoningResponse, "answer", needs_rest=lambda answer: False,
+            run_name="Final Revisions & Approval", priority=PRIORITY_HIGH
+        )
+    return await call_llm(messages, "review_section", schema=ReasoningResponse, run_name="Final Revisions & Approval", priority=PRIORITY_HIGH)
+
+async def finalize_research(state: ResearchState, config: RunnableConfig):
+    """Finalizes the research"""
+    print("Finalizing research...")
+
+    # Use the review drafted speculatively during evaluation, if there is one
+    response = await speculations.take(speculation_key(state), "finalize")
+    if response is None:
+        response = await review_section(state, config)
 
     print("Thought Process: ", response.thought_process)
     print("Answer: ", response.answer)
@@ -373,43 +949,76 @@ def finalize_research(state: ResearchState):
         state['section'].content = response.answer
 
     section = state['section']
+    for entry in state.get('prompt_tokens', []):
+        print(f"```{section.name}``` attempt {entry['attempt']} prompt tokens: "
+              f"{entry['query'] + entry['writing'] + entry.get('evaluation', 0)} {entry}")
+
+    if get_setting(config, "incremental", INCREMENTAL_MODE):
+        get_incremental_store().put("section", section_fingerprint(
+            state['topic'], section.name, section.description, section.research
+        ), section.content)
 
     return {"completed_sections": [section]}
 
 # Router Functions
 def review_router(state: ResearchState) -> str:
     """Routes the research process based on feedback answer and attempt count."""
-    MAX_ATTEMPTS = 3
+    MAX_ATTEMPTS = MAX_RESEARCH_ATTEMPTS
     
     if state["feedback"].answer == "continue_research" and state["iteration_counter"] < MAX_ATTEMPTS:
         print(f"Continuing research (attempt {state['iteration_counter']} of {MAX_ATTEMPTS})")
-        return "continue"
-    
-    if state["iteration_counter"] >= MAX_ATTEMPTS:
-        print(f"Maximum attempts ({MAX_ATTEMPTS}) reached. Finalizing research.")
+        route = "continue"
     else:
-        print("Research feedback complete. Finalizing research.")
-    
-    return "finalize"
+        if state["iteration_counter"] >= MAX_ATTEMPTS:
+            print(f"Maximum attempts ({MAX_ATTEMPTS}) reached. Finalizing research.")
+        else:
+            print("Research feedback complete. Finalizing research.")
+        route = "finalize"
+
+    # In speculative mode, keep the branch that won and cancel the other one
+    summary = speculations.resolve(speculation_key(state), route)
+    if summary is not None:
+        branches = ", ".join(
+            f"{branch} {stats['status']} ({stats['llm_calls']} LLM calls, {stats['tokens']} tokens, {stats['seconds']}s)"
+            for branch, stats in summary["branches"].items()
+        )
+        print(f"Speculation for ```{state['section'].name}```: kept {route}; {branches}")
+    return route
 
 def distribute_sections(state: ReportState):
     """Maps each section to a research subgraph instance"""
-    return [
-        Send("research_agent", {
-            "topic": state["topic"],
-            "report_structure": state["report_structure"],
-            "section": section,
-            "search_queries": [],
-            "feedback": None,
-            "iteration_counter": 0,
-            "completed_sections": []
-        }) for section in state["sections"]
-    ]
+    # Sections reused by incremental mode are already in completed_sections
+    completed_names = {section.name for section in state["completed_sections"]}
+    pending_sections = [section for section in state["sections"] if section.name not in completed_names]
+    if not pending_sections:
+        return "consolidate_results"
+
+    return [Send("research_agent", research_input(state, section)) for section in pending_sections]
+
+def research_input(state: ReportState, section: Section) -> dict:
+    """Initial research subgraph state for one section"""
+    return {
+        "topic": state["topic"],
+        "report_id": state["report_id"],
+        "report_structure": state["report_structure"],
+        "section": section,
+        "search_queries": [],
+        "feedback": None,
+        "iteration_counter": 0,
+        "completed_sections": [],
+        "seen_sources": [],
+        "novelty": [],
+        "prompt_tokens": []
+    }
 
 def consolidate_results(state: ReportState):
     """Reduces the processed sections back into the final report"""
-    # Extract sections from all research results
-    completed_sections = state["completed_sections"]
+    # Extract sections from all research results, in outline order
+    section_order = {section.name: index for index, section in enumerate(state["sections"])}
+    completed_sections = sorted(
+        state["completed_sections"],
+        key=lambda section: section_order.get(section.name, len(section_order))
+    )
 
     report_body = ""
     for section in completed_sections:
@@ -420,8 +1029,16 @@ def consolidate_results(state: ReportState):
     }
 
 
-def write_introduction(state: ReportState):
+async def write_introduction(state: ReportState, config: RunnableConfig):
     """Writes the introduction to the report"""
+    incremental = get_setting(config, "incremental", INCREMENTAL_MODE)
+    if incremental:
+        fingerprint = body_fingerprint(state['topic'], state['report_body'])
+        introduction = get_incremental_store().get("introduction", fingerprint)
+        if introduction is not None:
+            print("Report body unchanged, reusing introduction")
+            return {"introduction": introduction}
+
     system_prompt = intro_conclusion_instructions.format(
         topic=state['topic'],
         report_body=state['report_body']
@@ -432,12 +1049,22 @@ def write_introduction(state: ReportState):
         {"role": "user", "content": "Please write the introduction"}
     ]
 
-    introduction = llm.invoke(messages).content
+    introduction = (await call_llm(messages, "write_introduction", run_name="Write Introduction", priority=PRIORITY_HIGH)).content
+    if incremental:
+        get_incremental_store().put("introduction", fingerprint, introduction)
 
     return {"introduction": introduction}
 
-def write_conclusion(state: ReportState):
+async def write_conclusion(state: ReportState, config: RunnableConfig):
     """Writes the conclusion to the report"""
+    incremental = get_setting(config, "incremental", INCREMENTAL_MODE)
+    if incremental:
+        fingerprint = body_fingerprint(state['topic'], state['report_body'])
+        conclusion = get_incremental_store().get("conclusion", fingerprint)
+        if conclusion is not None:
+            print("Report body unchanged, reusing conclusion")
+            return {"conclusion": conclusion}
+
     system_prompt = intro_conclusion_instructions.format(
         topic=state['topic'],
         report_body=state['report_body']
@@ -448,7 +1075,9 @@ def write_conclusion(state: ReportState):
         {"role": "user", "content": "Please write the conclusion"}
     ]
 
-    conclusion = llm.invoke(messages).content
+    conclusion = (await call_llm(messages, "write_conclusion", run_name="Write Conclusion", priority=PRIORITY_HIGH)).content
+    if incremental:
+        get_incremental_store().put("conclusion", fingerprint, conclusion)
 
     return {"conclusion": conclusion}
 
@@ -460,15 +1089,65 @@ def finalize_report(state: ReportState):
     {state['report_body']}
     {state['conclusion']}
     """
+
+    release_research_pool(state['report_id'])
      
     return {"final_report": final_report}
 
 
+# Instrumentation
+def instrument_node(name: str, fn):
+    """Wraps a graph node to record its wall time and label the LLM and search calls it makes"""
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    async def node(state, config: RunnableConfig):
+        section = state.get("section")
+        attempt = ""
+        if section is not None:
+            # conduct_research runs attempt counter + 1; later nodes see the counter it incremented
+            attempt = state.get("iteration_counter", 0) + (1 if name == "conduct_research" else 0)
+        token = set_labels(
+            report=state.get("report_id") or get_setting(config, "thread_id", None),
+            section=section.name if section else None,
+            attempt=attempt,
+            node=name
+        )
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = fn(state, config) if takes_config else fn(state)
+            if inspect.isawaitable(result):
+                result = await result
+            status = "ok"
+            return result
+        finally:
+            metrics.observe("report_node_seconds", time.perf_counter() - start, status=status, **current_labels())
+            reset_labels(token)
+
+    node.__name__ = name
+    node.__doc__ = fn.__doc__
+    return node
+
+def export_metrics(report_id: str, output_dir: str = REPORT_OUTPUT_DIR):
+    """Writes the report's JSON run summary and the process-wide Prometheus metrics to output_dir
+
+    The report's per-run series are dropped afterwards, so long-running processes stay bounded.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, f"{report_id}.metrics.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.run_summary(report_id), f, indent=2)
+    metrics.drop_run(report_id)
+    with open(os.path.join(output_dir, "metrics.prom"), "w", encoding="utf-8") as f:
+        f.write(metrics.to_prometheus())
+    return summary_path
+
+
 # Research Graph
 builder = StateGraph(ResearchState, output=ResearchOutputState)
-builder.add_node("conduct_research", conduct_research)
-builder.add_node("evaluate_research", evaluate_research)
-builder.add_node("finalize_research", finalize_research)
+builder.add_node("conduct_research", instrument_node("conduct_research", conduct_research))
+builder.add_node("evaluate_research", instrument_node("evaluate_research", evaluate_research))
+builder.add_node("finalize_research", instrument_node("finalize_research", finalize_research))
 
 builder.add_edge(START, "conduct_research")
 builder.add_edge("conduct_research", "evaluate_research")
@@ -484,27 +1163,41 @@ builder.add_conditional_edges(
 
 builder.add_edge("finalize_research", END)
 
+# Compiled without its own checkpointer so that, when embedded in the main graph,
+# it inherits the parent's checkpointer and every research iteration is persisted
 research_agent = builder.compile()
 
+async def run_research_agent(state: ResearchState, config: RunnableConfig) -> dict:
+    """Researches one section sent by distribute_sections
+
+    Returns only the completed section: every parallel branch also carries report_id, topic and
+    report_structure, which the parent graph accepts from a single writer per step.
+    """
+    output = await research_agent.ainvoke(state, config)
+    return {"completed_sections": output["completed_sections"]}
+
+# Run directly from generate_section_list in pipelined mode; several of these run inside one
+# node, which a shared checkpoint namespace cannot represent, so they are not checkpointed
+pipelined_research_agent = builder.compile(checkpointer=False)
+
 
 # Main Report Graph
 main_graph_builder = StateGraph(ReportState)
 
 # Add nodes
-# Add nodes
-main_graph_builder.add_node("generate_report_structure", generate_report_structure)
-main_graph_builder.add_node("generate_section_list", generate_section_list)
-main_graph_builder.add_node("research_agent", builder.compile())
-main_graph_builder.add_node("consolidate_results", consolidate_results)
-main_graph_builder.add_node("write_introduction", write_introduction)
-main_graph_builder.add_node("write_conclusion", write_conclusion)
-main_graph_builder.add_node("finalize_report", finalize_report)
+main_graph_builder.add_node("generate_report_structure", instrument_node("generate_report_structure", generate_report_structure))
+main_graph_builder.add_node("generate_section_list", instrument_node("generate_section_list", generate_section_list))
+main_graph_builder.add_node("research_agent", run_research_agent)
+main_graph_builder.add_node("consolidate_results", instrument_node("consolidate_results", consolidate_results))
+main_graph_builder.add_node("write_introduction", instrument_node("write_introduction", write_introduction))
+main_graph_builder.add_node("write_conclusion", instrument_node("write_conclusion", write_conclusion))
+main_graph_builder.add_node("finalize_report", instrument_node("finalize_report", finalize_report))
 
 
 # Add edges
 main_graph_builder.add_edge(START, "generate_report_structure")
 main_graph_builder.add_edge("generate_report_structure", "generate_section_list")
-main_graph_builder.add_conditional_edges("generate_section_list", distribute_sections, ["research_agent"])
+main_graph_builder.add_conditional_edges("generate_section_list", distribute_sections, ["research_agent", "consolidate_results"])
 main_graph_builder.add_edge("research_agent", "consolidate_results")
 main_graph_builder.add_edge("consolidate_results", "write_introduction")
 main_graph_builder.add_edge("consolidate_results", "write_conclusion")
@@ -513,28 +1206,97 @@ main_graph_builder.add_edge("write_conclusion", "finalize_report")
 main_graph_builder.add_edge("finalize_report", END)
 graph = main_graph_builder.compile()
 
-graph = main_graph_builder.compile()
+
+# Checkpointing
+@asynccontextmanager
+async def open_checkpointer(path: str = CHECKPOINT_PATH):
+    """Opens the SQLite checkpointer that makes report runs resumable"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    serde = JsonPlusSerializer(allowed_msgpack_modules=[
+        (model.__module__, model.__name__)
+        for model in (Section, Sections, SearchQueries, FeedbackResponse, ReasoningResponse)
+    ])
+    async with aiosqlite.connect(path) as conn:
+        yield AsyncSqliteSaver(conn, serde=serde)
+
+def initial_report_state(topic: str, report_structure: str) -> ReportState:
+    """Empty report state for a topic and outline"""
+    return ReportState(
+        topic=topic,
+        report_structure=report_structure,
+        sections=[],
+        completed_sections=[],
+        introduction="",
+        report_body="",
+        conclusion="",
+        final_report=""
+    )
+
+def thread_config(thread_id: str, config: Optional[RunnableConfig] = None) -> RunnableConfig:
+    """Adds the checkpoint thread id to a run config"""
+    config = dict(config or {})
+    config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+    return config
+
+class CheckpointMismatch(Exception):
+    """Raised when a checkpoint thread holds a report for a different topic or structure than requested."""
+
+async def resume_input(checkpointed_graph, initial_state: ReportState, config: RunnableConfig):
+    """Returns (graph input, completed state) for config's thread
+
+    The input is None when the thread has unfinished work to resume; the completed state
+    is set (and nothing needs to run) when the thread already produced a final report.
+    Raises CheckpointMismatch if the thread was started for another topic or structure.
+    """
+    thread_id = config["configurable"]["thread_id"]
+    snapshot = await checkpointed_graph.aget_state(config)
+    for key in ("topic", "report_structure"):
+        if key in snapshot.values and snapshot.values[key] != initial_state[key]:
+            raise CheckpointMismatch(f"Report run {thread_id} was started with a different {key}; "
+                                     f"use a new thread id to generate this report")
+    if snapshot.next:
+        print(f"Resuming report run {thread_id} at {snapshot.next}")
+        return None, None
+    if snapshot.values.get("final_report"):
+        print(f"Report run {thread_id} already completed, returning checkpointed state")
+        return None, snapshot.values
+    return initial_state, None
+
+async def resume_or_run(checkpointed_graph, initial_state: ReportState, config: RunnableConfig):
+    """Runs a checkpointed graph for config's thread, resuming it if it has unfinished work"""
+    graph_input, completed_state = await resume_input(checkpointed_graph, initial_state, config)
+    if completed_state is not None:
+        return completed_state
+    return await checkpointed_graph.ainvoke(graph_input, config)
+
+async def run_report(initial_state: ReportState, thread_id: str, config: Optional[RunnableConfig] = None):
+    """Runs the report graph under the checkpointer, resuming thread_id if it has unfinished work"""
+    async with open_checkpointer() as checkpointer:
+        checkpointed_graph = main_graph_builder.compile(checkpointer=checkpointer)
+        return await resume_or_run(checkpointed_graph, initial_state, thread_config(thread_id, config))
 
 # Main Execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a research report")
+    parser.add_argument("--thread-id", default=None, help="Resume (or name) a checkpointed report run")
+    args = parser.parse_args()
+    thread_id = args.thread_id or str(uuid.uuid4())
+    print(f"Report run thread id: {thread_id} (pass --thread-id {thread_id} to resume)")
+
     async def main():
         user_input = """write me a report comparing and contrasting langgraph vs CrewAI"""
-        initial_state = ReportState(
-            topic=user_input,
-            report_structure="Features - a detailed comparison of the features of langgraph and crew AI. Use Cases - a discussion of the ideal use cases for each tool. Limitations - a comparison of the limitations of each tool. ",
-            sections=[],
-            completed_sections=[],
-            introduction="",
-            report_body="",
-            conclusion="",
-            final_report=""
+        initial_state = initial_report_state(
+            user_input,
+            "Features - a detailed comparison of the features of langgraph and crew AI. Use Cases - a discussion of the ideal use cases for each tool. Limitations - a comparison of the limitations of each tool. "
         )
 
 
         # final_research_state = await research_agent.ainvoke(research_state)
         # return final_research_state
 
-        final_state = await graph.ainvoke(initial_state)
+        final_state = await run_report(initial_state, thread_id)
         return final_state
 
     final_state = asyncio.run(main())
@@ -548,5 +1310,12 @@ if __name__ == "__main__":
     
 
     print("Number of sections: ", len(final_state["completed_sections"]))
-
-    markdown_to_pdf_enhanced(final_state['final_report'], "D:/data/reports/output.pdf")
\ No newline at end of file
+    print("Search cache: ", get_search_cache().stats())
+    print("Rate limiter: ", rate_limiter.metrics())
+    print("LLM usage by node and model:")
+    print(model_usage.format_report())
+    print("Node paths: ", node_paths.report())
+    print("Run metrics: ", export_metrics(thread_id))
+
+    os.makedirs(REPORT_OUTPUT_DIR, exist_ok=True)
+    render_pdf(final_state['final_report'], os.path.join(REPORT_OUTPUT_DIR, f"{thread_id}.pdf"))
\ No newline at end of file
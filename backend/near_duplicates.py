@@ -0,0 +1,129 @@
+#near_duplicates.py
+# Content-level near-duplicate detection for search results (bottom-k MinHash over word shingles)
+import hashlib
+import heapq
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+SHINGLE_SIZE = 5
+SKETCH_SIZE = 128
+# Only the start of very long pages is sketched; mirrors and syndicated copies diverge late if at all
+MAX_SKETCH_WORDS = 3000
+
+_WORD_RE = re.compile(r"\w+")
+
+
+# Query parameters that only track where a click came from; every other parameter can select a different page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "source", "spm"}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a URL so mirrors differing only in scheme, www., tracking parameters, parameter order or fragment compare equal.
+
+    >>> normalize_url("https://www.example.com/a/?utm_source=x&id=2&b=1#top")
+    'example.com/a?b=1&id=2'
+    >>> normalize_url("https://youtube.com/watch?v=AAA") == normalize_url("https://youtube.com/watch?v=BBB")
+    False
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if not _is_tracking_param(name))
+    return f"{host}{path}?{urlencode(params)}" if params else f"{host}{path}"
+
+
+def _hash(text: str) -> int:
+    # Stable across processes (unlike hash()), so sketches can be checkpointed
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def word_shingles(text: str, shingle_size: int = SHINGLE_SIZE, max_words: Optional[int] = None) -> set:
+    """Returns the set of lowercase word shingles of the text."""
+    words = _WORD_RE.findall(text.lower())
+    if max_words is not None:
+        words = words[:max_words]
+    if len(words) < shingle_size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+
+def content_sketch(text: str, shingle_size: int = SHINGLE_SIZE, sketch_size: int = SKETCH_SIZE) -> list:
+    """Returns the bottom-k MinHash sketch of the text's word shingles (sorted list of ints)."""
+    shingles = word_shingles(text, shingle_size, max_words=MAX_SKETCH_WORDS)
+    return heapq.nsmallest(sketch_size, {_hash(shingle) for shingle in shingles})
+
+
+def estimate_similarity(sketch_a: list, sketch_b: list, sketch_size: int = SKETCH_SIZE) -> float:
+    """Estimates the Jaccard similarity of two documents from their bottom-k sketches."""
+    if not sketch_a or not sketch_b:
+        return 0.0
+    set_a, set_b = set(sketch_a), set(sketch_b)
+    union_bottom = heapq.nsmallest(sketch_size, set_a | set_b)
+    shared = sum(1 for value in union_bottom if value in set_a and value in set_b)
+    return shared / len(union_bottom)
+
+
+def source_text(source: dict) -> str:
+    # The full page when it is known: snippets depend on the query, so copies of one article differ there
+    return source.get('raw_content') or source.get('content') or ''
+
+
+class NearDuplicateFilter:
+    """Drops sources whose URL or content nearly duplicates one already seen.
+
+    The seen set can be exported with to_state() and restored with from_state(), so
+    it carries across every attempt of a section's research loop.
+    """
+
+    def __init__(self, threshold: float = 0.8, seen: Optional[list] = None):
+        self.threshold = threshold
+        self.seen = list(seen or [])
+        self._seen_urls = {entry["url"] for entry in self.seen}
+
+    @classmethod
+    def from_state(cls, seen_sources: Optional[list], threshold: float = 0.8):
+        return cls(threshold=threshold, seen=seen_sources)
+
+    def to_state(self) -> list:
+        return list(self.seen)
+
+    def has_seen_url(self, url: str) -> bool:
+        return normalize_url(url) in self._seen_urls
+
+    def is_duplicate(self, url: str, sketch: list) -> bool:
+        if url in self._seen_urls:
+            return True
+        return any(estimate_similarity(sketch, entry["sketch"]) >= self.threshold for entry in self.seen)
+
+    def drop_seen_urls(self, sources: list) -> list:
+        """Returns the sources whose URL was neither seen before nor repeated earlier in the list, without recording them."""
+        kept, urls = [], set(self._seen_urls)
+        for source in sources:
+            url = normalize_url(source["url"])
+            if url not in urls:
+                urls.add(url)
+                kept.append(source)
+        return kept
+
+    def filter(self, sources: list):
+        """Returns (kept, dropped) lists; kept sources are added to the seen set."""
+        kept, dropped = [], []
+        for source in sources:
+            url = normalize_url(source["url"])
+            sketch = content_sketch(source_text(source))
+            if self.is_duplicate(url, sketch):
+                dropped.append(source)
+                continue
+            kept.append(source)
+            self.seen.append({"url": url, "sketch": sketch})
+            self._seen_urls.add(url)
+        return kept, dropped
@@ -0,0 +1,145 @@
+#outline_parser.py
+# Deterministic parser for well-formed report structures, so generate_section_list can skip the LLM
+import re
+
+_MARKDOWN_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*$")
+_ROMAN_HEADING_RE = re.compile(r"^([IVXLC]+)\.\s+(.+)$")
+_BULLET_RE = re.compile(r"^(?:[-*+•]|\d+[.)])\s+")
+# Names may contain hyphens ("LLM-based agents"); only a space-delimited dash separates the description
+_ITEM_NAME = r"(?P<name>(?:(?!\s[-–—]\s)[^:])+?)"
+_DASH_ITEM_RE = re.compile(r"^" + _ITEM_NAME + r"\s*\s[-–—]\s\s*(?P<description>.+)$")
+_COLON_ITEM_RE = re.compile(r"^" + _ITEM_NAME + r"\s*:\s\s*(?P<description>.+)$")
+_SENTENCE_RE = re.compile(r"(?<=[.;!?])\s+")
+
+MAX_NAME_WORDS = 8
+MAX_NAME_CHARS = 80
+
+# Sections that distill the rest of the report rather than needing web research
+_NO_RESEARCH_RE = re.compile(
+    r"\b(executive summary|summary|conclusions?|appendi(?:x|ces)|glossary|references|table of contents)\b",
+    re.IGNORECASE,
+)
+
+
+def needs_research(name: str) -> bool:
+    """Whether a section should be researched, judged from its name."""
+    return not _NO_RESEARCH_RE.search(name)
+
+
+def _is_name(text: str) -> bool:
+    text = text.strip()
+    return bool(text) and len(text) <= MAX_NAME_CHARS and len(text.split()) <= MAX_NAME_WORDS and text[0].isalnum()
+
+
+def _section(name: str, description_lines: list) -> dict:
+    name = name.strip().strip("*_").strip()
+    description = "\n".join(description_lines).strip() or name
+    return {"name": name, "description": description, "research": needs_research(name)}
+
+
+def _parse_headings(lines: list, match_heading):
+    """Splits lines at headings; the text under each heading becomes its description verbatim."""
+    sections, name, body = [], None, []
+    for line in lines:
+        heading = match_heading(line)
+        if heading is not None:
+            if name is not None:
+                sections.append(_section(name, body))
+            name, body = heading, []
+        elif name is None:
+            if line.strip():
+                return None  # free text before the first heading
+        else:
+            body.append(line)
+    if name is not None:
+        sections.append(_section(name, body))
+    return sections
+
+
+def _parse_markdown_headings(lines: list):
+    levels = [len(match.group(1)) for match in map(_MARKDOWN_HEADING_RE.match, lines) if match]
+    if not levels:
+        return None
+    top_level = min(levels)
+
+    def match_heading(line):
+        match = _MARKDOWN_HEADING_RE.match(line)
+        if match and len(match.group(1)) == top_level:
+            return match.group(2)
+        return None
+
+    return _parse_headings(lines, match_heading)
+
+
+def roman_to_int(numeral: str) -> int:
+    values = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100}
+    total = 0
+    for char, next_char in zip(numeral, numeral[1:] + " "):
+        value = values[char]
+        total += -value if values.get(next_char, 0) > value else value
+    return total
+
+
+def _parse_roman_headings(lines: list):
+    # Headings must count up from I., so lettered sub-sections such as "C. autogen" stay in the body
+    expected = [1]
+
+    def match_heading(line):
+        match = _ROMAN_HEADING_RE.match(line.strip())
+        if match and _is_name(match.group(2)) and roman_to_int(match.group(1)) == expected[0]:
+            expected[0] += 1
+            return match.group(2)
+        return None
+
+    sections = _parse_headings(lines, match_heading)
+    return sections if expected[0] > 2 else None
+
+
+def _parse_items(lines: list):
+    """Parses "Name - description" items (one per line or several per line) and "Name: description" items.
+
+    The colon form is only accepted at the start of a bulleted line or of a line in a
+    multi-line structure; inside running text "Note: keep it short" is an instruction,
+    not a section.
+    """
+    sections = []
+    multi_line = sum(1 for line in lines if line.strip()) > 1
+    for line in lines:
+        bulleted = bool(_BULLET_RE.match(line.strip()))
+        segments = _SENTENCE_RE.split(_BULLET_RE.sub("", line.strip()))
+        for index, segment in enumerate(segments):
+            if not segment:
+                continue
+            match = _DASH_ITEM_RE.match(segment)
+            if match is None and index == 0 and (bulleted or multi_line):
+                match = _COLON_ITEM_RE.match(segment)
+            if match and _is_name(match.group("name")):
+                sections.append({"name": match.group("name"), "description_lines": [match.group("description")]})
+            elif match and index == 0:
+                return None  # a line that looks like an item but has no usable name is ambiguous
+            elif sections:
+                sections[-1]["description_lines"].append(segment)
+            else:
+                return None  # free text before the first item
+    return [_section(item["name"], [" ".join(item["description_lines"])]) for item in sections]
+
+
+def parse_report_structure(report_structure: str):
+    """Parses a well-formed report structure into section dicts (name, description, research).
+
+    Handles markdown headings, roman-numeral headings ("I. Executive Summary") with the
+    section text below them, "Name - description" items (bulleted, numbered, one per
+    line or several on one line) and "Name: description" items (one per line). Returns None when the structure does not fit any of
+    these forms, so the caller can fall back to the LLM parser.
+    """
+    lines = [line.rstrip() for line in report_structure.strip().splitlines()]
+    if not lines:
+        return None
+    for parser in (_parse_markdown_headings, _parse_roman_headings, _parse_items):
+        sections = parser(lines)
+        if sections is None:
+            continue
+        if len(sections) < 2 or len({section["name"].lower() for section in sections}) < len(sections):
+            return None
+        return sections
+    return None
@@ -0,0 +1,102 @@
+#progress.py
+# Turns the report graph's astream_events into compact progress messages for streaming clients
+import main
+
+# Research subgraph nodes reported per section, with the message type sent when each starts
+SECTION_NODES = {
+    "conduct_research": "research_attempt",
+    "evaluate_research": "evaluation",
+    "finalize_research": "finalization",
+}
+# Report-level nodes reported when they start
+REPORT_NODES = {
+    "generate_section_list": "outlining",
+    "write_introduction": "writing_introduction",
+    "write_conclusion": "writing_conclusion",
+}
+# LLM calls (by run name) whose tokens are streamed to clients
+STREAMED_RUNS = {
+    "Write Section": "section",
+    "Write Introduction": "introduction",
+    "Write Conclusion": "conclusion",
+}
+
+
+class ProgressTranslator:
+    """Maps astream_events (v2) events to progress messages, remembering which section each run belongs to."""
+
+    def __init__(self):
+        self._sections = {}
+
+    def _section_of(self, event):
+        for run_id in reversed(event.get("parent_ids", [])):
+            if run_id in self._sections:
+                return self._sections[run_id]
+        return None
+
+    def translate(self, event: dict):
+        """Returns the progress message for an event, or None if clients do not need it."""
+        kind, name, data = event["event"], event["name"], event.get("data", {})
+        is_node = event.get("metadata", {}).get("langgraph_node") == name
+
+        if kind == "on_chain_start" and is_node and name in SECTION_NODES:
+            state = data.get("input") or {}
+            section = state.get("section")
+            if section is None:
+                return None
+            self._sections[event["run_id"]] = section.name
+            message = {"type": SECTION_NODES[name], "section": section.name}
+            if name == "conduct_research":
+                message["attempt"] = state.get("iteration_counter", 0) + 1
+            return message
+
+        if kind == "on_chain_end" and is_node and name == "evaluate_research":
+            feedback = (data.get("output") or {}).get("feedback")
+            if feedback is not None:
+                return {"type": "evaluation_result", "section": self._sections.get(event["run_id"]), "answer": feedback.answer}
+
+        if kind == "on_chain_end" and is_node and name == "finalize_research":
+            sections = (data.get("output") or {}).get("completed_sections") or []
+            if sections:
+                return {"type": "section_complete", "section": sections[0].name, "content": sections[0].content}
+
+        if kind == "on_chain_start" and is_node and name in REPORT_NODES:
+            return {"type": REPORT_NODES[name]}
+
+        if kind == "on_chain_end" and is_node and name == "generate_section_list":
+            sections = (data.get("output") or {}).get("sections") or []
+            return {"type": "sections", "sections": [section.name for section in sections]}
+
+        if kind == "on_custom_event" and name == "search_query":
+            return {"type": "search_query", **data}
+
+        if kind == "on_chat_model_stream" and name in STREAMED_RUNS:
+            text = getattr(data.get("chunk"), "content", "")
+            if text:
+                part = STREAMED_RUNS[name]
+                message = {"type": "token", "part": part, "text": text}
+                if part == "section":
+                    message["section"] = self._section_of(event)
+                return message
+        return None
+
+
+async def stream_report(checkpointed_graph, initial_state, config, publish):
+    """Runs (or resumes) a checkpointed report, calling publish(message) for each progress message
+
+    Returns the final report state, like main.resume_or_run.
+    """
+    graph_input, completed_state = await main.resume_input(checkpointed_graph, initial_state, config)
+    if completed_state is not None:
+        publish({"type": "report_complete", "resumed": True})
+        return completed_state
+
+    translator = ProgressTranslator()
+    async for event in checkpointed_graph.astream_events(graph_input, config, version="v2"):
+        message = translator.translate(event)
+        if message is not None:
+            publish(message)
+
+    final_state = (await checkpointed_graph.aget_state(config)).values
+    publish({"type": "report_complete", "resumed": False})
+    return final_state
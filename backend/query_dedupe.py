@@ -0,0 +1,65 @@
+#query_dedupe.py
+# Drops generated search queries that paraphrase queries already run (normalized-token similarity)
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be best by can compare comparison do does for from how in is it its of on or "
+    "the their to vs versus what when which why with".split()
+)
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def query_terms(query: str) -> frozenset:
+    """Normalizes a query to its set of stemmed content words."""
+    return frozenset(_stem(word) for word in _WORD_RE.findall(query.lower()) if word not in _STOPWORDS)
+
+
+def query_similarity(terms_a: frozenset, terms_b: frozenset) -> float:
+    """Similarity of two normalized queries: the larger of Jaccard and containment of the shorter query."""
+    if not terms_a or not terms_b:
+        return 1.0 if terms_a == terms_b else 0.0
+    shared = len(terms_a & terms_b)
+    jaccard = shared / len(terms_a | terms_b)
+    containment = shared / min(len(terms_a), len(terms_b))
+    # Containment only counts when the shorter query is specific enough to be meaningful
+    if min(len(terms_a), len(terms_b)) < 3:
+        containment = 0.0
+    return max(jaccard, containment)
+
+
+class QueryDeduper:
+    """Compares new queries against a history of queries (and each other) and flags near-duplicates."""
+
+    def __init__(self, history, threshold: float = 0.75):
+        self.threshold = threshold
+        self._history = [(query, query_terms(query)) for query in history]
+
+    def closest(self, query: str):
+        """Returns (history query, similarity) for the most similar query seen so far, or (None, 0.0)."""
+        terms = query_terms(query)
+        best_query, best_score = None, 0.0
+        for previous, previous_terms in self._history:
+            score = query_similarity(terms, previous_terms)
+            if score > best_score:
+                best_query, best_score = previous, score
+        return best_query, best_score
+
+    def split(self, queries: list):
+        """Returns (new queries, [(duplicate query, matching earlier query), ...])."""
+        new_queries, duplicates = [], []
+        for query in queries:
+            match, score = self.closest(query)
+            if match is not None and score >= self.threshold:
+                duplicates.append((query, match))
+                continue
+            new_queries.append(query)
+            self._history.append((query, query_terms(query)))
+        return new_queries, duplicates
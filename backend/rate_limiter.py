@@ -0,0 +1,179 @@
+#rate_limiter.py
+# Token-bucket scheduler shared by every LLM and search call in the report graph
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Lower numbers are served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Charges (or refunds, if negative) tokens after the fact; the balance may go into debt."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Limiter:
+    """Priority queue of waiters in front of one or more token buckets."""
+
+    def __init__(self, name: str, request_bucket: TokenBucket, token_bucket: Optional[TokenBucket] = None):
+        self.name = name
+        self.request_bucket = request_bucket
+        self.token_bucket = token_bucket
+        self._heap = []
+        self._sequence = itertools.count()
+        self._dispatcher = None
+        self._loop = None
+        self._wakeup = None
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._heap if not future.done())
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        else:
+            self._wakeup.set()
+
+    async def _dispatch(self):
+        while self._heap:
+            _, _, tokens, future = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                continue
+            now = time.monotonic()
+            delay = self.request_bucket.delay_for(1, now)
+            if self.token_bucket is not None:
+                delay = max(delay, self.token_bucket.delay_for(tokens, now))
+            if delay > 0:
+                # Sleep until the budget refills, or until a new waiter or refund arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            self.request_bucket.consume(1)
+            if self.token_bucket is not None:
+                self.token_bucket.consume(tokens)
+            future.set_result(None)
+
+    async def acquire(self, tokens: float = 0, priority: int = PRIORITY_NORMAL) -> float:
+        """Waits in priority order until the request fits the budgets; returns the time spent queued."""
+        enqueued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._sequence), tokens, future))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self._ensure_dispatcher()
+        await future
+        waited = time.monotonic() - enqueued_at
+        self.granted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def reconcile(self, estimated_tokens: float, actual_tokens: float):
+        """Corrects the token budget once the real usage of a call is known."""
+        if self.token_bucket is not None and actual_tokens is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+            if self._wakeup is not None and self._dispatcher is not None and not self._dispatcher.done():
+                self._wakeup.set()
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "granted": self.granted,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "avg_wait_seconds": round(self.total_wait / self.granted, 3) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+class RateLimitScheduler:
+    """Central scheduler enforcing RPM/TPM budgets per deployment and a QPS budget for search.
+
+    Callers queue by priority instead of failing; burst capacity is a sixth of the
+    per-minute budget, matching the 10 second windows Azure OpenAI enforces.
+    """
+
+    def __init__(self, default_rpm: float = 300, default_tpm: float = 150000, search_qps: float = 5):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self._llm_limiters = {}
+        self._search_limiter = _Limiter("search", TokenBucket(search_qps, search_qps))
+
+    def configure_llm(self, deployment: str, rpm: float, tpm: float):
+        """Sets the request and token budgets for one Azure OpenAI deployment."""
+        self._llm_limiters[deployment] = _Limiter(
+            deployment,
+            TokenBucket(rpm / 60, rpm / 6),
+            TokenBucket(tpm / 60, tpm / 6),
+        )
+
+    def configure_search(self, qps: float):
+        self._search_limiter = _Limiter("search", TokenBucket(qps, qps))
+
+    def _llm_limiter(self, deployment: str) -> _Limiter:
+        if deployment not in self._llm_limiters:
+            self.configure_llm(deployment, self.default_rpm, self.default_tpm)
+        return self._llm_limiters[deployment]
+
+    @asynccontextmanager
+    async def llm_slot(self, deployment: str, estimated_tokens: float, priority: int = PRIORITY_NORMAL):
+        """Reserves budget for one LLM call; set `slot['actual_tokens']` to reconcile the estimate."""
+        limiter = self._llm_limiter(deployment)
+        slot = {"queue_wait": await limiter.acquire(estimated_tokens, priority), "actual_tokens": None}
+        try:
+            yield slot
+        finally:
+            limiter.reconcile(estimated_tokens, slot["actual_tokens"])
+
+    async def search_slot(self, priority: int = PRIORITY_NORMAL) -> float:
+        """Waits for the search QPS budget and returns the time spent queued."""
+        return await self._search_limiter.acquire(0, priority)
+
+    def metrics(self) -> dict:
+        """Returns queue-depth and wait-time metrics for every limiter."""
+        return {
+            "llm": {name: limiter.metrics() for name, limiter in self._llm_limiters.items()},
+            "search": self._search_limiter.metrics(),
+        }
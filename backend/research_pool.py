@@ -0,0 +1,102 @@
+#research_pool.py
+# Report-scoped pool of search results, fetched sources and chunks shared by every section
+import asyncio
+
+from chunk_index import ChunkIndex
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ResearchPool:
+    """Material retrieved by any section of a report, available to all of its other sections.
+
+    Identical searches are served from the pool (including searches still in flight
+    for another section), and sources are indexed once in a shared ChunkIndex.
+    """
+
+    def __init__(self):
+        self.search_results = {}
+        self.sources = {}
+        self.chunk_index = ChunkIndex()
+        self.searches_issued = 0
+        self.searches_reused = 0
+        self._inflight = {}
+
+    async def search(self, query: str, search_fn):
+        """Runs search_fn(query) unless this report already searched (or is searching) the same query."""
+        key = normalize_query(query)
+        if key in self.search_results:
+            self.searches_reused += 1
+            return self.search_results[key]
+        if key in self._inflight:
+            self.searches_reused += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.searches_issued += 1
+        task = asyncio.ensure_future(search_fn(query))
+        self._inflight[key] = task
+        try:
+            result = await task
+        finally:
+            self._inflight.pop(key, None)
+        if result is not None:
+            self.search_results[key] = result
+        return result
+
+    def queries(self) -> list:
+        """Returns every (normalized) query this report has searched or is searching."""
+        return list(self.search_results) + [key for key in self._inflight if key not in self.search_results]
+
+    def cached_result(self, query: str):
+        """Returns the stored response for a query this report already ran, if any."""
+        return self.search_results.get(normalize_query(query))
+
+    def add_sources(self, sources: list):
+        """Adds sources to the pool and indexes their content.
+
+        A source pooled as a snippet is replaced (and re-indexed) once its full page arrives.
+        """
+        for source in sources:
+            pooled = self.sources.get(source['url'])
+            if pooled is None:
+                self.sources[source['url']] = source
+                self.chunk_index.add_source(source)
+            elif source.get('raw_content') and not pooled.get('raw_content'):
+                self.sources[source['url']] = source
+                self.chunk_index.replace_source(source)
+
+    def relevant_sources(self, query: str, k: int, min_term_coverage: float) -> list:
+        """Returns pooled sources whose best passages cover at least min_term_coverage of the query terms."""
+        urls = []
+        for chunk in self.chunk_index.search(query, k=k):
+            if chunk['term_coverage'] >= min_term_coverage and chunk['url'] not in urls:
+                urls.append(chunk['url'])
+        return [self.sources[url] for url in urls]
+
+    def stats(self) -> dict:
+        return {
+            "searches_issued": self.searches_issued,
+            "searches_reused": self.searches_reused,
+            "sources": len(self.sources),
+            "chunks": len(self.chunk_index),
+        }
+
+
+# Report-scoped pools, keyed by report id
+_pools = {}
+
+
+def get_research_pool(report_id: str) -> ResearchPool:
+    """Returns the research pool for a report, creating it on first use."""
+    if report_id not in _pools:
+        _pools[report_id] = ResearchPool()
+    return _pools[report_id]
+
+
+def release_research_pool(report_id: str):
+    """Frees a report's research pool once the report is finished."""
+    pool = _pools.pop(report_id, None)
+    if pool is not None:
+        print("Research pool: ", pool.stats())
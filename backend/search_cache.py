@@ -0,0 +1,209 @@
+#search_cache.py
+# Two-tier (memory LRU + SQLite) cache for Tavily search responses
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def make_search_cache_key(query: str, topic: str = "general", days: Optional[int] = None, include_raw_content: bool = True) -> str:
+    """Builds a stable cache key from the parameters that change a Tavily response."""
+    payload = json.dumps(
+        {
+            "query": " ".join(query.split()).lower(),
+            "topic": topic,
+            "days": days,
+            "include_raw_content": bool(include_raw_content),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_extract_cache_key(url: str) -> str:
+    """Builds the cache key for the extracted full content of a single URL."""
+    payload = json.dumps({"extract": url.strip()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Search result cache with an in-memory LRU tier in front of an optional SQLite tier.
+
+    Any object exposing aget(key), aset(key, value) and stats() can be plugged into
+    main.py in place of this class. aget/aset serve the memory tier inline and run
+    SQLite work in a worker thread, so concurrent reports on one event loop never wait
+    on disk; expiry and eviction of the disk tier run at most every prune_interval_seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 86400, max_memory_entries: int = 512,
+                 max_disk_entries: int = 10000, prune_interval_seconds: float = 60):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = 0.0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)")
+            self._conn.commit()
+
+    def _is_fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is None or now - created_at < self.ttl_seconds
+
+    def _remember(self, key: str, value, created_at: float):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _get_memory(self, key: str, now: float):
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if self._is_fresh(created_at, now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+        return None
+
+    def get(self, key: str):
+        """Returns the cached value for key, or None if it is missing or stale."""
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+            if value is not None:
+                return value
+            return self._get_disk(key, now)
+
+    async def aget(self, key: str):
+        """Like get(), but reads the disk tier in a worker thread."""
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+            if value is not None or self._conn is None:
+                return value if value is not None else self._get_disk(key, now)
+        return await asyncio.to_thread(self._locked_get_disk, key, now)
+
+    def _locked_get_disk(self, key: str, now: float):
+        with self._lock:
+            return self._get_disk(key, now)
+
+    def _get_disk(self, key: str, now: float):
+        """Looks key up in the disk tier (caller holds the lock) and counts the hit or miss."""
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, created_at = json.loads(row[0]), row[1]
+                if self._is_fresh(created_at, now):
+                    self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self._remember(key, value, created_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value):
+        """Stores value under key in both tiers, evicting the least recently used entries."""
+        if value is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._conn is not None:
+            self._write_disk(key, value, now)
+
+    async def aset(self, key: str, value):
+        """Like set(), but writes the disk tier in a worker thread."""
+        if value is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self._conn is not None:
+            await asyncio.to_thread(self._write_disk, key, value, now)
+
+    def _write_disk(self, key: str, value, now: float):
+        payload = json.dumps(value)
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if now - self._last_prune >= self.prune_interval_seconds:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float):
+        """Drops expired entries and evicts the least recently used ones beyond max_disk_entries."""
+        self._last_prune = now
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        """Drops every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
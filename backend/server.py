@@ -0,0 +1,182 @@
+#server.py
+# HTTP job service for report generation: one warm process, shared clients and compiled graph
+#
+# Usage: python server.py --port 5000
+#   POST /jobs {"topic": ..., "report_structure": ...}  -> 202 {"job_id": ...}
+#   GET  /jobs/<job_id>                                  -> status and per-job timing
+#   GET  /jobs/<job_id>/events                           -> server-sent progress events and tokens
+#   POST /jobs/<job_id>/cancel                           -> stops a queued or running job
+#   GET  /jobs/<job_id>/pdf                              -> the finished report
+#   GET  /jobs/<job_id>/metrics                          -> JSON run summary of the job's metrics
+#   GET  /stats                                          -> worker pool, cache and rate limiter stats
+#   GET  /metrics                                        -> Prometheus metrics of the process (by node, deployment, status)
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import AsyncExitStack
+
+from flask import Flask, Response, jsonify, request, send_file
+from flask_cors import CORS
+
+import main
+from configs import *
+from jobs import JobManager, JobRejected, SUCCEEDED, FAILED, FINISHED_STATUSES
+from progress import stream_report
+
+# Seconds between keep-alive comments on an idle event stream
+SSE_HEARTBEAT_SECONDS = 15
+
+# Resources opened once on the job loop and shared by every job
+_resources = AsyncExitStack()
+checkpointed_graph = None
+
+
+async def open_shared_resources():
+    """Opens the checkpointer, compiles the report graph and creates the clients once for the whole process"""
+    global checkpointed_graph
+    # main.py creates clients lazily; build them now so the first job does not pay for it
+    main.warm_up()
+    checkpointer = await _resources.enter_async_context(main.open_checkpointer())
+    # Create the tables up front so a job that fails before its first checkpoint can still clear its thread
+    await checkpointer.setup()
+    checkpointed_graph = main.main_graph_builder.compile(checkpointer=checkpointer)
+
+
+async def run_job(job):
+    """Generates one report and renders the PDF
+
+    Job ids only live in memory, so a job can never be resumed after a restart; the
+    checkpointer only holds the run's state while it runs and is cleared when it ends.
+    """
+    initial_state = main.initial_report_state(
+        job.params["topic"], job.params.get("report_structure") or report_structure
+    )
+    start = time.perf_counter()
+    try:
+        final_state = await stream_report(checkpointed_graph, initial_state, main.thread_config(job.id), job.publish)
+    except BaseException:
+        # finalize_report never ran, so free the report's research pool here (the report id is the job id)
+        main.release_research_pool(job.id)
+        raise
+    finally:
+        # Keep the run's summary on the job and drop its per-run series from the shared registry
+        job.metrics = main.metrics.run_summary(job.id)
+        main.metrics.drop_run(job.id)
+        # Nothing resumes the job's thread, so don't let its checkpoints accumulate on disk
+        await checkpointed_graph.checkpointer.adelete_thread(job.id)
+    job.phases["graph"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    os.makedirs(REPORT_OUTPUT_DIR, exist_ok=True)
+    pdf_path = os.path.join(REPORT_OUTPUT_DIR, f"{job.id}.pdf")
+    await asyncio.to_thread(main.render_pdf, final_state["final_report"], pdf_path)
+    job.phases["pdf"] = time.perf_counter() - start
+    return {"pdf_path": pdf_path, "sections": len(final_state["completed_sections"])}
+
+
+def create_app(manager: JobManager) -> Flask:
+    app = Flask(__name__)
+    CORS(app)
+
+    @app.post("/jobs")
+    def submit_job():
+        payload = request.get_json(silent=True) or {}
+        topic = (payload.get("topic") or "").strip()
+        if not topic:
+            return jsonify({"error": "topic is required"}), 400
+        try:
+            job = manager.submit({"topic": topic, "report_structure": payload.get("report_structure")})
+        except JobRejected as e:
+            response = jsonify({"error": str(e)})
+            response.headers["Retry-After"] = "30"
+            return response, 429
+        return jsonify(job.to_dict()), 202
+
+    @app.get("/jobs/<job_id>")
+    def job_status(job_id):
+        job = manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "unknown job"}), 404
+        return jsonify(job.to_dict())
+
+    @app.get("/jobs/<job_id>/events")
+    def job_events(job_id):
+        job = manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "unknown job"}), 404
+        # Reconnecting clients resume after the last event they saw
+        try:
+            since = int(request.headers.get("Last-Event-ID", -1)) + 1
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+
+        def stream():
+            nonlocal since
+            while True:
+                events = job.wait_events(since, SSE_HEARTBEAT_SECONDS)
+                for event_id, event in events:
+                    yield f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                    since = event_id + 1
+                if job.status in FINISHED_STATUSES and since >= job.next_event_id:
+                    return
+                if not events:
+                    yield ": keep-alive\n\n"
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.post("/jobs/<job_id>/cancel")
+    def cancel_job(job_id):
+        job = manager.cancel(job_id)
+        if job is None:
+            return jsonify({"error": "unknown job"}), 404
+        return jsonify(job.to_dict()), 202
+
+    @app.get("/jobs/<job_id>/pdf")
+    def job_pdf(job_id):
+        job = manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "unknown job"}), 404
+        if job.status == FAILED:
+            return jsonify({"error": f"job failed: {job.error}"}), 409
+        if job.status != SUCCEEDED:
+            return jsonify({"error": f"job is {job.status}"}), 409
+        return send_file(os.path.abspath(job.result["pdf_path"]), mimetype="application/pdf",
+                         download_name=f"report-{job.id}.pdf")
+
+    @app.get("/jobs/<job_id>/metrics")
+    def job_metrics(job_id):
+        job = manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "unknown job"}), 404
+        return jsonify(job.metrics if job.metrics is not None else main.metrics.run_summary(job_id))
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        return Response(main.metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    @app.get("/stats")
+    def stats():
+        return jsonify({
+            "jobs": manager.stats(),
+            "search_cache": main.get_search_cache().stats(),
+            "rate_limiter": main.rate_limiter.metrics(),
+            "llm_usage": main.model_usage.report(),
+        })
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve report generation jobs over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Reports generated concurrently")
+    parser.add_argument("--queue-limit", type=int, default=JOB_QUEUE_LIMIT, help="Queued jobs before submissions get 429")
+    args = parser.parse_args()
+
+    manager = JobManager(run_job, workers=args.workers, max_queued=args.queue_limit,
+                         history_limit=JOB_HISTORY_LIMIT, on_startup=open_shared_resources)
+    manager.start()
+    create_app(manager).run(host=args.host, port=args.port, threaded=True)
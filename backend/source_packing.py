@@ -0,0 +1,132 @@
+#source_packing.py
+# Token-budgeted packing of Tavily search results into research prompts
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+# Blocks smaller than this are dropped rather than truncated to fit the remaining budget
+MIN_PARTIAL_SOURCE_TOKENS = 64
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: Optional[str] = None):
+    """Returns the tiktoken encoding for the deployment's model, or None if it cannot be loaded."""
+    try:
+        if model_name:
+            try:
+                return tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"Warning: could not load tokenizer ({e}), falling back to a character estimate")
+        return None
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """Counts tokens with the model's tokenizer (~4 characters per token if it is unavailable)."""
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+    """Truncates text to at most max_tokens tokens."""
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def flatten_search_results(search_response) -> list:
+    """Takes either a single search response or list of responses from Tavily API and returns the sources."""
+    if isinstance(search_response, dict):
+        return list(search_response['results'])
+    if isinstance(search_response, list):
+        sources_list = []
+        for response in search_response:
+            if isinstance(response, dict) and 'results' in response:
+                sources_list.extend(response['results'])
+            else:
+                sources_list.extend(response)
+        return sources_list
+    raise ValueError("Input must be either a dict with 'results' or a list of search results")
+
+
+def rank_sources(sources_list: list) -> list:
+    """Deduplicates sources by URL and orders them by Tavily relevance score, best first."""
+    unique_sources = {}
+    for source in sources_list:
+        existing = unique_sources.get(source['url'])
+        if existing is None or (source.get('score') or 0) > (existing.get('score') or 0):
+            unique_sources[source['url']] = source
+    return sorted(unique_sources.values(), key=lambda source: source.get('score') or 0, reverse=True)
+
+
+def format_source(source: dict, max_tokens_per_source: int, include_raw_content: bool, model_name: Optional[str] = None) -> str:
+    """Formats a single source, capping its snippet and raw content at max_tokens_per_source each."""
+    parts = [
+        f"Source {source['title']}:\n===\n",
+        f"URL: {source['url']}\n===\n",
+        f"Most relevant content from source: {truncate_to_tokens(source['content'] or '', max_tokens_per_source, model_name)}\n===\n",
+    ]
+    if include_raw_content:
+        raw_content = source.get('raw_content') or ''
+        if not raw_content:
+            print(f"Warning: No raw_content found for source {source['url']}")
+        truncated = truncate_to_tokens(raw_content, max_tokens_per_source, model_name)
+        if len(truncated) < len(raw_content):
+            truncated += "... [truncated]"
+        parts.append(f"Full source content limited to {max_tokens_per_source} tokens: {truncated}\n\n")
+    else:
+        parts.append("\n")
+    return "".join(parts)
+
+
+def pack_sources(search_response, token_budget: int, max_tokens_per_source: int, include_raw_content: bool = True, model_name: Optional[str] = None):
+    """Packs the most relevant sources into a prompt block under a global token budget.
+
+    Returns the formatted text and a stats dict with the number of sources and
+    tokens that were packed and dropped.
+    """
+    ranked = rank_sources(flatten_search_results(search_response))
+    header = "Sources:\n\n"
+    parts = [header]
+    remaining = token_budget - count_tokens(header, model_name)
+    stats = {
+        "sources_total": len(ranked),
+        "sources_packed": 0,
+        "sources_truncated": 0,
+        "sources_dropped": 0,
+        "tokens_packed": token_budget - remaining,
+        "tokens_dropped": 0,
+        "token_budget": token_budget,
+    }
+
+    for source in ranked:
+        block = format_source(source, max_tokens_per_source, include_raw_content, model_name)
+        block_tokens = count_tokens(block, model_name)
+        if block_tokens <= remaining:
+            parts.append(block)
+            remaining -= block_tokens
+            stats["sources_packed"] += 1
+            stats["tokens_packed"] += block_tokens
+        elif remaining >= MIN_PARTIAL_SOURCE_TOKENS:
+            truncated = truncate_to_tokens(block, remaining, model_name)
+            truncated_tokens = count_tokens(truncated, model_name)
+            parts.append(truncated + "... [truncated]\n\n")
+            stats["sources_packed"] += 1
+            stats["sources_truncated"] += 1
+            stats["tokens_packed"] += truncated_tokens
+            stats["tokens_dropped"] += block_tokens - truncated_tokens
+            remaining = 0
+        else:
+            stats["sources_dropped"] += 1
+            stats["tokens_dropped"] += block_tokens
+
+    return "".join(parts).strip(), stats
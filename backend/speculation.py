@@ -0,0 +1,79 @@
+#speculation.py
+# Speculative execution of the research loop's next step while evaluate_research is still running
+import asyncio
+import contextvars
+import time
+
+# Usage accumulator of the speculative branch the current task belongs to (None outside speculation)
+_current_usage = contextvars.ContextVar("speculative_usage", default=None)
+
+
+def record_llm_usage(tokens):
+    """Charges an LLM call to the speculative branch running in the current task, if any."""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage["llm_calls"] += 1
+        usage["tokens"] += tokens or 0
+
+
+class SpeculationRegistry:
+    """Tracks speculative branches by key so the router can keep the winner and cancel the loser."""
+
+    def __init__(self):
+        self._branches = {}
+
+    def start(self, key, branch: str, coroutine_fn):
+        """Starts coroutine_fn() as a speculative branch in the background."""
+        usage = {"llm_calls": 0, "tokens": 0, "started_at": time.perf_counter(), "seconds": None}
+
+        async def run():
+            _current_usage.set(usage)
+            try:
+                return await coroutine_fn()
+            finally:
+                usage["seconds"] = time.perf_counter() - usage["started_at"]
+
+        task = asyncio.ensure_future(run())
+        self._branches.setdefault(key, {})[branch] = (task, usage)
+
+    def resolve(self, key, winner: str):
+        """Keeps the winning branch, cancels the others and returns the cost/latency of every branch."""
+        branches = self._branches.get(key)
+        if not branches:
+            return None
+        now = time.perf_counter()
+        summary = {"winner": winner, "branches": {}}
+        for branch, (task, usage) in list(branches.items()):
+            status = "done" if task.done() else "running"
+            if branch != winner:
+                task.cancel()
+                del branches[branch]
+                status = "cancelled" if status == "running" else "discarded"
+            summary["branches"][branch] = {
+                "status": status,
+                "llm_calls": usage["llm_calls"],
+                "tokens": usage["tokens"],
+                "seconds": round(usage["seconds"] if usage["seconds"] is not None else now - usage["started_at"], 3),
+            }
+        if not branches:
+            del self._branches[key]
+        return summary
+
+    async def take(self, key, branch: str):
+        """Awaits the result of a speculative branch and forgets it; returns None if there is none or it failed."""
+        branches = self._branches.get(key)
+        if not branches or branch not in branches:
+            return None
+        task, usage = branches.pop(branch)
+        if not branches:
+            del self._branches[key]
+        try:
+            return await task
+        except Exception as e:
+            print(f"Speculative {branch} branch failed ({e}), recomputing")
+            return None
+
+    def discard(self, key):
+        """Cancels every branch under key (e.g. when the step that would resolve them failed or was cancelled)."""
+        for task, _ in self._branches.pop(key, {}).values():
+            task.cancel()
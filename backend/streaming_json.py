@@ -0,0 +1,87 @@
+#streaming_json.py
+# Incremental JSON scanner that reports each value as soon as it is closed, for streamed structured outputs
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class StreamingJsonParser:
+    """Scans JSON text fed in arbitrary fragments and reports every completed value with its path.
+
+    feed() returns a list of (path, value) events, where path is the tuple of object keys and
+    array indices leading to the value, e.g. ("sections", 2) for the third element of the
+    top-level "sections" array, and () for the root document once it is complete.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._scalar_start = None
+
+    def _path(self) -> tuple:
+        return tuple(frame["key"] if frame["type"] == "object" else frame["index"] for frame in self._stack)
+
+    def _emit(self, value, events: list):
+        if not self._stack:
+            self.done = True
+            events.append(((), value))
+            return
+        frame = self._stack[-1]
+        if frame["type"] == "object" and frame["expect"] == "key":
+            frame["key"] = value
+            return
+        events.append((self._path(), value))
+
+    def _finish_scalar(self, end: int, events: list):
+        if self._scalar_start is not None:
+            self._emit(json.loads(self.buffer[self._scalar_start:end]), events)
+            self._scalar_start = None
+
+    def feed(self, text: str) -> list:
+        """Adds a fragment of JSON text and returns the (path, value) events it completed."""
+        self.buffer += text
+        events = []
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._emit(json.loads(buffer[self._string_start:i + 1]), events)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._stack.append({
+                    "type": "object" if char == "{" else "array",
+                    "start": i, "key": None, "index": 0, "expect": "key",
+                })
+            elif char in "}]":
+                self._finish_scalar(i, events)
+                frame = self._stack.pop()
+                value = json.loads(buffer[frame["start"]:i + 1])
+                self._emit(value, events)
+            elif char == ":":
+                self._stack[-1]["expect"] = "value"
+            elif char == ",":
+                self._finish_scalar(i, events)
+                frame = self._stack[-1]
+                if frame["type"] == "object":
+                    frame["expect"] = "key"
+                else:
+                    frame["index"] += 1
+            elif char in _WHITESPACE:
+                self._finish_scalar(i, events)
+            elif self._scalar_start is None and self._stack:
+                self._scalar_start = i
+        self._pos = len(buffer)
+        return events
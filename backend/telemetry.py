@@ -0,0 +1,258 @@
+#telemetry.py
+# Latency, token, cost and cache accounting for graph nodes, LLM calls and searches
+import contextvars
+import threading
+from collections import defaultdict, deque
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Returns the nearest-rank percentile of values (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ModelUsageTracker:
+    """Collects every LLM call under its (node, deployment) pair and reports latency and cost.
+
+    Latency totals cover every call; the p95 is taken over the last sample_size calls,
+    so a long-running process keeps a fixed amount of state per pair.
+    """
+
+    def __init__(self, pricing: dict = None, sample_size: int = 1024):
+        # deployment -> (input cost, output cost) per 1K tokens
+        self.pricing = pricing or {}
+        self._calls = defaultdict(lambda: {
+            "calls": 0, "errors": 0, "seconds": 0.0, "queue_seconds": 0.0,
+            "recent_latencies": deque(maxlen=sample_size), "input_tokens": 0, "output_tokens": 0,
+        })
+        self._lock = threading.Lock()
+
+    def set_price(self, deployment: str, input_cost_per_1k: float, output_cost_per_1k: float):
+        self.pricing[deployment] = (input_cost_per_1k, output_cost_per_1k)
+
+    def record(self, node: str, deployment: str, seconds: float, queue_wait: float = 0.0,
+               input_tokens: int = 0, output_tokens: int = 0, error: bool = False):
+        """Records one LLM call made by node against deployment."""
+        with self._lock:
+            entry = self._calls[(node, deployment)]
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["seconds"] += seconds
+            entry["queue_seconds"] += queue_wait
+            entry["recent_latencies"].append(seconds)
+            entry["input_tokens"] += input_tokens or 0
+            entry["output_tokens"] += output_tokens or 0
+
+    def cost(self, deployment: str, input_tokens: int, output_tokens: int) -> float:
+        input_price, output_price = self.pricing.get(deployment, (0.0, 0.0))
+        return input_tokens / 1000 * input_price + output_tokens / 1000 * output_price
+
+    def report(self) -> list:
+        """Returns one row per (node, deployment) with call counts, latency percentiles, tokens and cost."""
+        rows = []
+        with self._lock:
+            for (node, deployment), entry in sorted(self._calls.items()):
+                rows.append({
+                    "node": node,
+                    "deployment": deployment,
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "mean_seconds": round(entry["seconds"] / entry["calls"], 3) if entry["calls"] else 0.0,
+                    "p95_seconds": round(percentile(list(entry["recent_latencies"]), 0.95), 3),
+                    "queue_seconds": round(entry["queue_seconds"], 3),
+                    "input_tokens": entry["input_tokens"],
+                    "output_tokens": entry["output_tokens"],
+                    "cost": round(self.cost(deployment, entry["input_tokens"], entry["output_tokens"]), 4),
+                })
+        return rows
+
+    def format_report(self) -> str:
+        """Formats report() as a fixed-width table."""
+        lines = [
+            f"{'node':<22} {'deployment':<20} {'calls':>5} {'err':>4} {'mean (s)':>9} {'p95 (s)':>8} "
+            f"{'queue (s)':>9} {'in tok':>8} {'out tok':>8} {'cost':>8}"
+        ]
+        total_cost = 0.0
+        for row in self.report():
+            total_cost += row["cost"]
+            lines.append(
+                f"{row['node']:<22} {str(row['deployment']):<20} {row['calls']:>5} {row['errors']:>4} "
+                f"{row['mean_seconds']:>9.3f} {row['p95_seconds']:>8.3f} {row['queue_seconds']:>9.3f} "
+                f"{row['input_tokens']:>8} {row['output_tokens']:>8} {row['cost']:>8.4f}"
+            )
+        lines.append(f"{'total cost':<22} {total_cost:>.4f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+
+
+class EventCounter:
+    """Counts labelled events, e.g. which path a node took."""
+
+    def __init__(self):
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, event: str, label: str):
+        with self._lock:
+            self._counts[(event, label)] += 1
+
+    def report(self) -> dict:
+        """Returns {event: {label: count}}."""
+        with self._lock:
+            report = defaultdict(dict)
+            for (event, label), count in sorted(self._counts.items()):
+                report[event][label] = count
+            return dict(report)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+# Labels (report, section, attempt) of the graph node running in the current task;
+# set by instrument_node and read by every LLM/search call made while it runs
+_labels = contextvars.ContextVar("telemetry_labels", default={})
+
+
+def current_labels() -> dict:
+    return _labels.get()
+
+
+def set_labels(**labels):
+    """Sets the labels for the current task and returns a token for reset_labels()."""
+    return _labels.set({key: "" if value is None else str(value) for key, value in labels.items()})
+
+
+def reset_labels(token):
+    _labels.reset(token)
+
+
+# Labels that identify one run; kept only in that run's summary, never in the Prometheus export
+RUN_LABELS = ("report", "section", "attempt")
+
+
+def _accumulate(series: dict, key: tuple, value, summary: bool):
+    if summary:
+        entry = series.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["sum"] += value
+        entry["max"] = max(entry["max"], value)
+    else:
+        series[key] = series.get(key, 0) + value
+
+
+def _roll_up(rollup: dict, label: str, value):
+    """Adds a counter value or a summary ({count, sum, max}) to rollup[label]."""
+    if isinstance(value, dict):
+        entry = rollup.setdefault(label, {"count": 0, "sum": 0.0, "max": 0.0})
+        entry["count"] += value["count"]
+        entry["sum"] = round(entry["sum"] + value["sum"], 6)
+        entry["max"] = max(entry["max"], value["max"])
+    else:
+        rollup[label] = rollup.get(label, 0) + value
+
+
+class MetricsRegistry:
+    """In-process counters and summaries (count/sum/max) keyed by metric name and labels.
+
+    Process-wide series keep only low-cardinality labels (node, deployment, status, ...) and
+    are exported as Prometheus text (to_prometheus). Series labeled with a report, section
+    and attempt are kept per report for its JSON run summary (run_summary) until drop_run().
+    """
+
+    def __init__(self):
+        self._help = {}
+        self._types = {}
+        self._values = defaultdict(dict)
+        self._runs = defaultdict(lambda: defaultdict(dict))
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._types[name] = metric_type
+        self._help[name] = help_text
+
+    def _record(self, name: str, value: float, labels: dict, summary: bool):
+        key = tuple(sorted((label, value) for label, value in labels.items() if label not in RUN_LABELS))
+        with self._lock:
+            _accumulate(self._values[name], key, value, summary)
+            report = labels.get("report")
+            if report:
+                _accumulate(self._runs[report][name], tuple(sorted(labels.items())), value, summary)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self._record(name, value, labels, summary=False)
+
+    def observe(self, name: str, value: float, **labels):
+        self._record(name, value, labels, summary=True)
+
+    def samples(self, name: str) -> list:
+        """Returns [(labels dict, value)] for one process-wide metric."""
+        with self._lock:
+            return [(dict(key), value if not isinstance(value, dict) else dict(value))
+                    for key, value in self._values.get(name, {}).items()]
+
+    def to_prometheus(self) -> str:
+        """Renders every process-wide metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._values):
+                metric_type = self._types.get(name, "untyped")
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for key, value in sorted(self._values[name].items()):
+                    if isinstance(value, dict):
+                        lines.append(f"{name}_count{_format_labels(key)} {value['count']}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {value['sum']:.6f}")
+                    else:
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def run_summary(self, report: str = None) -> dict:
+        """Aggregates the metrics of one report (or every report still kept) into a JSON-friendly summary.
+
+        Summaries are rolled up by node, by section and by research attempt of each section
+        ({section: {attempt: ...}}), so the slowest and costliest parts of a run stand out.
+        """
+        summary = {}
+        with self._lock:
+            runs = [self._runs[report]] if report in self._runs else [] if report is not None else list(self._runs.values())
+            names = {name for run in runs for name in run}
+            for name in names:
+                by_node, by_section, by_attempt = {}, {}, {}
+                for run in runs:
+                    for key, value in run.get(name, {}).items():
+                        labels = dict(key)
+                        _roll_up(by_node, labels.get("node", ""), value)
+                        _roll_up(by_section, labels.get("section", ""), value)
+                        if labels.get("section") and labels.get("attempt"):
+                            _roll_up(by_attempt.setdefault(labels["section"], {}), labels["attempt"], value)
+                if by_node:
+                    summary[name] = {"by_node": by_node, "by_section": by_section, "by_attempt": by_attempt}
+        return summary
+
+    def drop_run(self, report: str):
+        """Forgets a report's per-run series once its summary has been taken."""
+        with self._lock:
+            self._runs.pop(report, None)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+            self._runs.clear()
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in key) + "}"